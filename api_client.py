@@ -0,0 +1,224 @@
+"""Общий HTTP-клиент с пулом соединений для всех наборов тестов
+
+requests импортируется при первом запросе, а не при импорте модуля:
+загрузка наборов тестов, планирование и выбор по кэшу обходятся без него.
+"""
+import atexit
+import threading
+import time
+
+import config
+import metrics
+from test_utils import TestOutput
+
+DEFAULT_HEADERS = {"accept": "application/json"}
+
+# Повторяем только сбои шлюза, ответы 4xx проверяются самими тестами
+RETRY_STATUSES = (502, 503, 504)
+
+
+class ApiClient:
+    """Клиент поверх requests.Session: keep-alive, пул, таймауты и повторы"""
+
+    def __init__(self, pool_connections=config.POOL_CONNECTIONS,
+                 pool_maxsize=config.POOL_MAXSIZE, timeout=config.TIMEOUT,
+                 retries=config.RETRIES, backoff=config.RETRY_BACKOFF,
+                 headers=None):
+        self.timeout = timeout
+        self._options = (pool_connections, pool_maxsize, retries, backoff, headers)
+        self._session = None
+        self._adapter = None
+        self._session_lock = threading.Lock()
+
+        self.rate_limiter = None
+        # token_recovery(access_token) -> новый токен или None, вызывается при ответе 401
+        self.token_recovery = None
+        self._listeners = []
+
+    def _connect(self):
+        """Создание сессии и пула при первом обращении"""
+        with self._session_lock:
+            if self._session is not None:
+                return
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            pool_connections, pool_maxsize, retries, backoff, headers = self._options
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            if headers:
+                session.headers.update(headers)
+
+            retry = Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=RETRY_STATUSES,
+                raise_on_status=False,
+            )
+            self._adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=retry,
+            )
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._connect()
+        return self._session
+
+    @property
+    def adapter(self):
+        if self._adapter is None:
+            self._connect()
+        return self._adapter
+
+    def add_listener(self, listener):
+        """Подписка на завершённые запросы: listener(method, url, response, elapsed)
+
+        При сетевой ошибке response равен None. Для stream=True подписчик
+        вызывается при закрытии ответа, elapsed - время до конца чтения тела.
+        """
+        self._listeners = [*self._listeners, listener]
+
+    def remove_listener(self, listener):
+        self._listeners = [item for item in self._listeners if item is not listener]
+
+    def request(self, method, url, **kwargs):
+        """Выполнение запроса через общий пул соединений
+
+        Если сервер отверг токен из кэша (401), запрос повторяется один раз
+        с токеном, полученным через token_recovery.
+        """
+        response = self._send(method, url, **kwargs)
+        if response.status_code == 401 and self.token_recovery is not None:
+            headers = kwargs.get("headers") or {}
+            scheme, _, token = headers.get("Authorization", "").partition(" ")
+            new_token = self.token_recovery(token) if scheme == "Bearer" and token else None
+            if new_token:
+                response.close()
+                kwargs["headers"] = {**headers, "Authorization": f"Bearer {new_token}"}
+                response = self._send(method, url, **kwargs)
+        return response
+
+    def _send(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        # Ленивая загрузка requests не должна попадать в замер запроса
+        session = self.session
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        start = time.perf_counter()
+        response = None
+        try:
+            response = session.request(method, url, **kwargs)
+        finally:
+            if response is None or not kwargs.get("stream"):
+                self._notify(method, url, response, time.perf_counter() - start)
+        if kwargs.get("stream"):
+            self._notify_on_close(method, url, response, start)
+        return response
+
+    def _notify(self, method, url, response, elapsed):
+        for listener in self._listeners:
+            listener(method, url, response, elapsed)
+
+    def _notify_on_close(self, method, url, response, start):
+        """Замер потокового ответа завершается, когда тело дочитано и ответ закрыт"""
+        close = response.close
+
+        def close_and_notify():
+            response.close = close
+            # Подписчики видят ответ до закрытия, пока доступен счётчик прочитанного
+            self._notify(method, url, response, time.perf_counter() - start)
+            close()
+
+        response.close = close_and_notify
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def connection_stats(self):
+        """Сколько запросов обслужено и сколько соединений открыто"""
+        if self._adapter is None:
+            return {"requests": 0, "connections": 0, "reused": 0}
+        pools = self.adapter.poolmanager.pools
+        with pools.lock:
+            host_pools = list(pools._container.values())
+        sent = sum(pool.num_requests for pool in host_pools)
+        opened = sum(pool.num_connections for pool in host_pools)
+        return {
+            "requests": sent,
+            "connections": opened,
+            "reused": max(sent - opened, 0),
+        }
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class TokenBucket:
+    """Ограничение частоты запросов: rate в секунду, всплеск до burst"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Ожидание свободного токена"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+client = ApiClient()
+
+if config.CASSETTE:
+    import cassette
+
+    _close_cassette = cassette.install(client, config.CASSETTE, config.CASSETTE_MODE)
+    if _close_cassette:
+        atexit.register(_close_cassette)
+
+
+if config.FAULTS:
+    import faults
+
+    fault_adapter = faults.install(client, faults.FaultProfile.parse(config.FAULTS))
+
+if config.RATE_LIMIT:
+    client.rate_limiter = TokenBucket(config.RATE_LIMIT, burst=config.RATE_BURST)
+
+
+def _report_stats():
+    stats = client.connection_stats()
+    if stats["requests"]:
+        TestOutput.print_connection_stats(stats)
+    if config.FAULTS:
+        TestOutput.print_fault_stats(fault_adapter.stats)
+
+
+atexit.register(_report_stats)
+
+if config.METRICS_REPORT:
+    metrics.report_on_exit(client, config.METRICS_REPORT)
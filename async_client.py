@@ -0,0 +1,41 @@
+"""Асинхронная обёртка над общим HTTP-клиентом для параллельных запросов"""
+import asyncio
+import unittest
+
+import config
+from api_client import client
+from fixtures import admin_token, auth_headers
+
+
+class AsyncApiClient:
+    """Запросы выполняются в потоках через общий пул соединений
+
+    Семафор ограничивает число запросов в полёте, по умолчанию размером
+    пула, чтобы лишние соединения не открывались и не закрывались.
+    Семафор привязан к циклу событий, поэтому клиент создаётся на тест.
+    """
+
+    def __init__(self, http=client, max_in_flight=config.MAX_IN_FLIGHT):
+        self.http = http
+        self._semaphore = asyncio.BoundedSemaphore(max_in_flight)
+
+    async def request(self, method, url, **kwargs):
+        async with self._semaphore:
+            return await asyncio.to_thread(self.http.request, method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+
+class AsyncApiTestCase(unittest.IsolatedAsyncioTestCase):
+    """Базовый класс асинхронных тестов с токеном администратора"""
+
+    async def asyncSetUp(self):
+        self.api = AsyncApiClient()
+        self.user_headers = auth_headers(await asyncio.to_thread(admin_token))
@@ -0,0 +1,188 @@
+"""Общий кэш токенов авторизации с продлением через refresh token"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка файла между процессами недоступна
+    fcntl = None
+
+import config
+from api_client import client
+
+JSON_HEADERS = {"accept": "application/json", "Content-Type": "application/json"}
+
+
+def token_lifetime(token, default=config.TOKEN_TTL):
+    """Время жизни JWT в секундах по полям exp и iat"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"]) - float(claims["iat"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return default
+
+
+class TokenProvider:
+    """Один логин на учётные данные за прогон, общий для потоков и процессов
+
+    Токены хранятся в памяти и в файле config.TOKEN_CACHE_FILE, поэтому
+    параллельные процессы получают уже выданный токен. Записи файла помечены
+    идентификатором прогона, токены прошлых прогонов не используются. Срок
+    жизни считается от момента получения, а не по часам сервера. Перед
+    истечением токен продлевается через /auth/refresh_token, повторный логин
+    нужен только если продление не удалось. Токен, отвергнутый сервером
+    (рестарт, сброс базы, отзыв сеансов), заменяется через recover().
+    """
+
+    def __init__(self, base_url=config.BASE_URL, cache_file=config.TOKEN_CACHE_FILE,
+                 renew_margin=config.TOKEN_RENEW_MARGIN, http=client, run_id=config.RUN_ID):
+        self.base_url = base_url
+        self.cache_file = cache_file
+        self.renew_margin = renew_margin
+        self.http = http
+        self.run_id = run_id
+        self._entries = {}
+        self._credentials = {}
+        # Выданный токен -> ключ записи, в том числе уже заменённые токены
+        self._issued = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def access_token(self, login, password):
+        """Действующий access token для учётных данных"""
+        key = self._key(login, password)
+        self._credentials[key] = (login, password)
+        with self._lock_for(key):
+            entry = self._entries.get(key)
+            if self._is_fresh(entry):
+                return entry["accessToken"]
+            with self._file_lock():
+                entries = self._read_file()
+                entry = entries.get(key, entry)
+                if not self._is_fresh(entry):
+                    entry = self._renew(entry) or self._login(login, password)
+                    entries[key] = entry
+                    self._write_file(entries)
+            self._entries[key] = entry
+            self._issued[entry["accessToken"]] = key
+            return entry["accessToken"]
+
+    def isolated(self, login, password):
+        """Отдельная пара токенов вне кэша для тестов, завершающих сеансы"""
+        return self._login(login, password)
+
+    def invalidate(self, login, password):
+        """Сброс кэша после отзыва сеансов учётной записи"""
+        key = self._key(login, password)
+        with self._lock_for(key):
+            self._entries.pop(key, None)
+            with self._file_lock():
+                entries = self._read_file()
+                if entries.pop(key, None) is not None:
+                    self._write_file(entries)
+
+    def recover(self, access_token):
+        """Новый access token взамен отвергнутого сервером (ответ 401)
+
+        Возвращает None, если токен выдан не этим кэшем.
+        """
+        key = self._issued.get(access_token)
+        if key is None:
+            return None
+        login, password = self._credentials[key]
+        with self._lock_for(key):
+            # Другой поток мог уже заменить токен
+            if self._entries.get(key, {}).get("accessToken") == access_token:
+                self._entries.pop(key)
+                with self._file_lock():
+                    entries = self._read_file()
+                    if entries.get(key, {}).get("accessToken") == access_token:
+                        entries.pop(key)
+                        self._write_file(entries)
+        return self.access_token(login, password)
+
+    def _login(self, login, password):
+        response = self.http.post(
+            f"{self.base_url}/auth/login",
+            headers=JSON_HEADERS,
+            data=json.dumps({"login": login, "password": password}),
+        )
+        response.raise_for_status()
+        return self._entry(response.json())
+
+    def _renew(self, entry):
+        if not entry or not entry.get("refreshToken"):
+            return None
+        response = self.http.post(
+            f"{self.base_url}/auth/refresh_token",
+            headers={**JSON_HEADERS, "Authorization": f"Bearer {entry['refreshToken']}"},
+        )
+        if response.status_code != 200:
+            return None
+        body = response.json()
+        body.setdefault("refreshToken", entry["refreshToken"])
+        return self._entry(body)
+
+    @staticmethod
+    def _entry(body):
+        access_token = body["accessToken"]
+        return {
+            "accessToken": access_token,
+            "refreshToken": body.get("refreshToken"),
+            "expiresAt": time.time() + token_lifetime(access_token),
+        }
+
+    def _is_fresh(self, entry):
+        return bool(entry) and entry["expiresAt"] - self.renew_margin > time.time()
+
+    def _key(self, login, password):
+        raw = f"{self.base_url}\0{login}\0{password}".encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    def _lock_for(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def _file_lock(self):
+        if not self.cache_file or fcntl is None:
+            yield
+            return
+        fd = os.open(f"{self.cache_file}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _read_file(self):
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Записи других прогонов отбрасываются и не переписываются обратно
+        return {key: entry for key, entry in entries.items() if entry.get("runId") == self.run_id}
+
+    def _write_file(self, entries):
+        if not self.cache_file:
+            return
+        tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({key: {**entry, "runId": self.run_id} for key, entry in entries.items()}, f)
+        os.replace(tmp_path, self.cache_file)
+
+
+tokens = TokenProvider()
+client.token_recovery = tokens.recover
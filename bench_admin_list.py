@@ -0,0 +1,147 @@
+"""Замер масштабируемости /admin/list/users от числа пользователей
+
+Для каждого N из --sizes база дополняется сидером до N тестовых
+пользователей, затем каждый фильтр и список без фильтра запрашиваются
+--repeat раз. Задержка (медиана, с чтением всего тела) и объём ответа
+сводятся в таблицу. Наклон в логарифмических осях оценивает степень роста:
+1 - линейный, больше --threshold - сверхлинейный (вероятно, нет индекса или
+полный просмотр таблицы). Результаты сохраняются в bench_results/ и
+сравниваются с предыдущим запуском.
+
+    python bench_admin_list.py --sizes 1000 10000 100000
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from config import BASE_URL
+from fixtures import admin_token, auth_headers
+from metrics import linear_trend
+from seed_data import seeder
+from streaming import stream_list
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results")
+
+
+def filter_cases(sample_user):
+    """Фильтры списка: без фильтра и по каждому полю из тестов"""
+    return {
+        "без фильтра": {},
+        "username": {"username": sample_user["username"]},
+        "email": {"email": sample_user["email"]},
+        "isBanned": {"isBanned": False},
+    }
+
+
+def measure(params, repeat):
+    """Медиана времени полного чтения списка, число записей и байт"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response, summary = stream_list(
+            f"{BASE_URL}/admin/list/users", headers=auth_headers(admin_token()), params=params,
+        )
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return {
+        "latency_ms": statistics.median(timings) * 1000,
+        "records": summary.count,
+        "bytes": summary.bytes_read,
+    }
+
+
+def growth_exponent(points):
+    """Наклон log(задержка) от log(N) методом наименьших квадратов"""
+    fit = linear_trend([(math.log(n), math.log(value)) for n, value in points if n > 0 and value > 0])
+    return fit[0] if fit else None
+
+
+def previous_results():
+    files = sorted(glob.glob(os.path.join(RESULTS_DIR, "admin_list-*.json")))
+    if not files:
+        return None
+    with open(files[-1], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"admin_list-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def report(results, previous, threshold, stream=sys.stdout):
+    """Таблица замеров, наклоны роста и сравнение с прошлым запуском"""
+    old = {}
+    if previous:
+        old = {(row["filter"], row["size"]): row for row in previous["rows"]}
+
+    stream.write(f"\n{'Фильтр':<14}{'N':>9}{'Записей':>10}{'КБ':>10}{'мс':>10}{'Δ к прошлому':>15}\n")
+    for row in results["rows"]:
+        before = old.get((row["filter"], row["size"]))
+        delta = ""
+        if before and before["latency_ms"]:
+            delta = f"{(row['latency_ms'] / before['latency_ms'] - 1) * 100:+.0f}%"
+        stream.write(
+            f"{row['filter']:<14}{row['size']:>9}{row['records']:>10}"
+            f"{row['bytes'] / 1024:>10.1f}{row['latency_ms']:>10.1f}{delta:>15}\n"
+        )
+
+    flagged = False
+    stream.write("\nРост задержки (наклон в log-log осях):\n")
+    for name, exponent in results["exponents"].items():
+        if exponent is None:
+            stream.write(f"  {name}: недостаточно точек\n")
+            continue
+        mark = ""
+        if exponent > threshold:
+            mark = "  <- сверхлинейный рост, проверьте индексы"
+            flagged = True
+        stream.write(f"  {name}: {exponent:.2f}{mark}\n")
+    return not flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="запросов на точку")
+    parser.add_argument("--threshold", type=float, default=1.2, help="допустимый наклон роста")
+    args = parser.parse_args(argv)
+
+    data_seeder = seeder()
+    users = []
+    rows = []
+    try:
+        for size in sorted(args.sizes):
+            users += data_seeder.create_users(size - len(users))
+            print(f"Пользователей создано: {len(users)}")
+            for name, params in filter_cases(users[0]).items():
+                rows.append({"filter": name, "size": size, **measure(params, args.repeat)})
+    finally:
+        data_seeder.teardown()
+
+    exponents = {}
+    for name in filter_cases(users[0]):
+        points = [(row["size"], row["latency_ms"]) for row in rows if row["filter"] == name]
+        exponents[name] = growth_exponent(points)
+
+    results = {
+        "baseUrl": BASE_URL,
+        "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": rows,
+        "exponents": exponents,
+    }
+    ok = report(results, previous_results(), args.threshold)
+    print(f"\nРезультаты: {save_results(results)}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""Устойчивость потоков аутентификации при деградации сети
+
+Для каждого профиля сети (faults.FaultProfile) создаётся отдельный клиент
+с транспортом, внедряющим сбои, и частотой, ограниченной TokenBucket.
+Потоки /auth/login, /auth/refresh_token и /recovery/reset-password
+выполняются --duration секунд в --threads потоков. Для каждой пары профиль
+и поток выводятся доля успешных ответов, полезная пропускная способность
+(успехи в секунду) и её доля от чистой сети, перцентили задержки с учётом
+повторов, число попыток на запрос и виды ошибок. Результаты сохраняются
+в bench_results/.
+
+    python bench_resilience.py --duration 20 --threads 8 --rps 50
+    python bench_resilience.py --profile "мобильная сеть=latency=300,jitter=150,bandwidth=16"
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from requests import RequestException
+
+import config
+import faults
+from api_client import ApiClient, TokenBucket
+from fixtures import auth_headers, invalidate_admin_token
+from metrics import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results")
+JSON_HEADERS = {"accept": "application/json", "Content-Type": "application/json"}
+
+PROFILES = {
+    "чистая сеть": "",
+    "задержка": "latency=100,jitter=50",
+    "узкий канал": "bandwidth=16",
+    "обрывы": "drop=0.05",
+    "серии 503": "errors=0.05,burst=3",
+    "всё сразу": "latency=100,jitter=50,bandwidth=64,drop=0.03,errors=0.03,burst=3",
+}
+
+
+def _login(http, login, password):
+    return http.post(f"{config.BASE_URL}/auth/login", headers=JSON_HEADERS,
+                     data=json.dumps({"login": login, "password": password}))
+
+
+class Flows:
+    """Запросы потоков; состояние (refresh token) у каждого потока своё"""
+
+    def __init__(self, http, login, password):
+        self.http = http
+        self.login_name = login
+        self.password = password
+        self._local = threading.local()
+
+    def login(self):
+        return _login(self.http, self.login_name, self.password)
+
+    def prepare_refresh(self):
+        """Refresh token потока; логин выполняется вне замера, None при сбое"""
+        if getattr(self._local, "refresh_token", None) is None:
+            try:
+                response = self.login()
+            except RequestException:
+                return None
+            if response.status_code == 200:
+                self._local.refresh_token = response.json()["refreshToken"]
+        return getattr(self._local, "refresh_token", None)
+
+    def refresh(self):
+        token, self._local.refresh_token = self._local.refresh_token, None
+        # При сетевой ошибке токен мог быть уже заменён сервером, следующий
+        # запрос потока начнётся с нового логина
+        response = self.http.post(
+            f"{config.BASE_URL}/auth/refresh_token",
+            headers={**JSON_HEADERS, "Authorization": f"Bearer {token}"},
+        )
+        self._local.refresh_token = response.json()["refreshToken"] if response.status_code == 200 else None
+        return response
+
+    def reset(self):
+        return self.http.post(f"{config.BASE_URL}/recovery/reset-password", headers=JSON_HEADERS,
+                              data=json.dumps({"email": config.ADMIN_EMAIL}))
+
+
+FLOWS = {
+    "/auth/login": "login",
+    "/auth/refresh_token": "refresh",
+    "/recovery/reset-password": "reset",
+}
+
+# Подготовка перед каждым замеренным запросом потока, вне замера
+PREPARE = {
+    "/auth/refresh_token": "prepare_refresh",
+}
+
+
+def measure(flows, flow, threads, duration):
+    """Запуск одного потока запросов, возвращает задержки, исходы и ошибки"""
+    call = getattr(flows, FLOWS[flow])
+    prepare = getattr(flows, PREPARE[flow]) if flow in PREPARE else None
+    latencies, statuses, errors = [], {}, {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def work():
+        while time.monotonic() < deadline:
+            if prepare is not None and prepare() is None:
+                continue
+            start = time.perf_counter()
+            try:
+                response = call()
+            except RequestException as error:
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    errors[type(error).__name__] = errors.get(type(error).__name__, 0) + 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sorted(latencies), statuses, errors
+
+
+def run_profile(name, spec, args):
+    profile = faults.FaultProfile.parse(spec)
+    if profile.seed is None:
+        profile.seed = config.SEED
+    http = ApiClient(pool_maxsize=args.threads, timeout=args.timeout)
+    adapter = faults.install(http, profile)
+    if args.rps:
+        http.rate_limiter = TokenBucket(args.rps, burst=args.threads)
+    flows = Flows(http, args.login, args.password)
+
+    rows = []
+    try:
+        for flow in FLOWS:
+            attempts_before = adapter.stats["attempts"]
+            latencies, statuses, errors = measure(flows, flow, args.threads, args.duration)
+            total = len(latencies)
+            ok = statuses.get(200, 0)
+            rows.append({
+                "profile": name,
+                "spec": str(profile),
+                "flow": flow,
+                "requests": total,
+                "ok": ok,
+                "goodput": ok / args.duration,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "attempts_per_request": (adapter.stats["attempts"] - attempts_before) / total if total else 0,
+                "statuses": {str(code): count for code, count in sorted(statuses.items())},
+                "errors": errors,
+            })
+    finally:
+        http.close()
+    return rows
+
+
+def cleanup(login, password):
+    """Завершение сеансов, открытых замером, и сброс кэша токенов"""
+    http = ApiClient()
+    try:
+        response = _login(http, login, password)
+        if response.status_code == 200:
+            headers = auth_headers(response.json()["accessToken"])
+            http.delete(f"{config.BASE_URL}/user/info/sessions/revoke/all", headers=headers)
+            http.get(f"{config.BASE_URL}/auth/logout", headers=headers)
+    except RequestException:
+        pass
+    finally:
+        http.close()
+    if login == config.ADMIN_LOGIN:
+        invalidate_admin_token()
+
+
+def report(rows, stream=sys.stdout):
+    clean = {row["flow"]: row["goodput"] for row in rows if row["profile"] == next(iter(PROFILES))}
+    stream.write(
+        f"\n{'Профиль':<14}{'Поток':<26}{'Успех':>8}{'Усп/с':>8}{'Сохр.':>8}"
+        f"{'p50, мс':>9}{'p95, мс':>9}{'Попыток':>9}  Ошибки\n"
+    )
+    for row in rows:
+        share = row["ok"] / row["requests"] if row["requests"] else 0
+        baseline = clean.get(row["flow"])
+        kept = f"{row['goodput'] / baseline:.0%}" if baseline else "-"
+        problems = {**{code: count for code, count in row["statuses"].items() if code != "200"},
+                    **row["errors"]}
+        stream.write(
+            f"{row['profile']:<14}{row['flow']:<26}{share:>8.1%}{row['goodput']:>8.1f}{kept:>8}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['attempts_per_request']:>9.2f}  "
+            f"{', '.join(f'{name}: {count}' for name, count in problems.items()) or '-'}\n"
+        )
+
+
+def save_results(rows):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"resilience-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"baseUrl": config.BASE_URL, "rows": rows}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def _parse_profile(value):
+    name, _, spec = value.partition("=")
+    faults.FaultProfile.parse(spec)
+    return name, spec
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-d", "--duration", type=float, default=10, help="секунд на поток и профиль")
+    parser.add_argument("-t", "--threads", type=int, default=8)
+    parser.add_argument("-r", "--rps", type=float, default=0, help="ограничение частоты, 0 - без него")
+    parser.add_argument("--timeout", type=float, default=config.TIMEOUT, help="таймаут запроса, с")
+    parser.add_argument("--profile", action="append", type=_parse_profile,
+                        help="имя=профиль сбоев, можно указать несколько раз")
+    parser.add_argument("--login", default=config.ADMIN_LOGIN)
+    parser.add_argument("--password", default=config.ADMIN_PASSWORD)
+    args = parser.parse_args(argv)
+
+    profiles = dict(PROFILES)
+    profiles.update(args.profile or [])
+    rows = []
+    try:
+        for name, spec in profiles.items():
+            print(f"Профиль «{name}»: {spec or 'без сбоев'}")
+            rows += run_profile(name, spec, args)
+    finally:
+        cleanup(args.login, args.password)
+    report(rows)
+    print(f"\nРезультаты: {save_results(rows)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Бюджеты задержки эндпоинтов для функциональных тестов
+
+Бюджет объявляется рядом с классом тестов или на отдельном тесте:
+
+    @latency_budgets({"/admin/list/users": LatencyBudget(300)})
+    class AdminUsersPositiveTests(unittest.TestCase): ...
+
+    @latency_budget("/auth/login", 150, quantile=95)
+    def test_01_login_success(self): ...
+
+Тест повторяется samples раз, перцентиль считается по всем замерам
+эндпоинта, поэтому единичный выброс не валит тест. Режим задаётся через
+config.BUDGET_MODE: fail, warn или off.
+"""
+import functools
+import threading
+import unittest
+import warnings
+
+import config
+from api_client import client
+from metrics import endpoint_template, percentile
+from test_utils import TestOutput
+
+
+class LatencyBudgetWarning(UserWarning):
+    """Превышение бюджета задержки в режиме warn"""
+
+
+class LatencyBudget:
+    """Перцентиль quantile задержки эндпоинта не должен превышать ms"""
+
+    def __init__(self, ms, quantile=95):
+        self.ms = ms
+        self.quantile = quantile
+
+    def violation(self, endpoint, latencies_ms):
+        """Текст нарушения или None, если бюджет соблюдён"""
+        observed = percentile(sorted(latencies_ms), self.quantile)
+        if observed <= self.ms:
+            return None
+        return (
+            f"{endpoint}: p{self.quantile} = {observed:.1f} мс"
+            f" при бюджете {self.ms} мс ({len(latencies_ms)} замеров)"
+        )
+
+
+class _ThreadLatencies:
+    """Задержки запросов, сделанных в потоке теста"""
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.by_endpoint = {}
+
+    def __call__(self, method, url, response, elapsed):
+        if threading.get_ident() != self.thread_id:
+            return
+        for key in (endpoint_template(url), f"{method} {endpoint_template(url)}"):
+            self.by_endpoint.setdefault(key, []).append(elapsed * 1000)
+
+
+def _with_budgets(test, budgets, samples):
+    @functools.wraps(test)
+    def wrapper(self):
+        if config.BUDGET_MODE == "off":
+            return test(self)
+
+        latencies = _ThreadLatencies()
+        client.add_listener(latencies)
+        try:
+            test(self)
+            # Тест не обращался к эндпоинтам с бюджетом, повторять нечего
+            if not any(endpoint in latencies.by_endpoint for endpoint in budgets):
+                return
+            with TestOutput.muted():
+                for _ in range(1, samples or config.BUDGET_SAMPLES):
+                    test(self)
+        finally:
+            client.remove_listener(latencies)
+
+        violations = [
+            budget.violation(endpoint, latencies.by_endpoint[endpoint])
+            for endpoint, budget in budgets.items()
+            if endpoint in latencies.by_endpoint
+        ]
+        violations = [text for text in violations if text]
+        if not violations:
+            return
+        if config.BUDGET_MODE == "warn":
+            for text in violations:
+                warnings.warn(text, LatencyBudgetWarning, stacklevel=2)
+        else:
+            self.fail("Превышен бюджет задержки:\n" + "\n".join(violations))
+
+    return wrapper
+
+
+def latency_budgets(budgets, samples=None):
+    """Бюджеты {эндпоинт: LatencyBudget} для теста или всех тестов класса
+
+    Эндпоинт задаётся шаблоном пути (/admin/info/user/{id}), при
+    необходимости с методом (GET /admin/list/users).
+    """
+    def decorate(target):
+        if not isinstance(target, type):
+            return _with_budgets(target, budgets, samples)
+        for name in unittest.defaultTestLoader.getTestCaseNames(target):
+            setattr(target, name, _with_budgets(getattr(target, name), budgets, samples))
+        return target
+    return decorate
+
+
+def latency_budget(endpoint, ms, quantile=95, samples=None):
+    """Бюджет одного эндпоинта для теста"""
+    return latency_budgets({endpoint: LatencyBudget(ms, quantile)}, samples)
@@ -0,0 +1,201 @@
+"""Запись и воспроизведение HTTP-взаимодействий (кассеты)
+
+API_CASSETTE=path API_CASSETTE_MODE=record - запросы идут на сервер,
+пары запрос/ответ дописываются в JSONL-файл. API_CASSETTE_MODE=replay -
+ответы берутся из кассеты без сети.
+
+Первая строка кассеты - метаданные с seed случайных данных тестов. Рядом
+пишется индекс path.idx: ключ запроса -> смещения строк в файле. При
+воспроизведении файл отображается в память, поиск ответа - обращение к
+словарю и срез mmap. Ключ: метод, путь с отсортированными параметрами и
+нормализованное тело, без хоста и заголовков. Повторы одного запроса
+отдаются в порядке записи, последний ответ повторяется.
+"""
+import base64
+import hashlib
+import io
+import json
+import mmap
+import os
+import random
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import config
+
+FORMAT_VERSION = 1
+
+
+class CassetteMiss(ConnectionError):
+    """Запроса нет в кассете"""
+
+
+def request_key(method, url, body):
+    """Ключ запроса: метод, путь, отсортированные параметры и тело"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        body = body or ""
+    raw = f"{method.upper()} {parts.path}?{query}\n{body}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _encode_body(content):
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(content).decode()}
+
+
+def _decode_body(entry):
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry["body"].encode("utf-8")
+
+
+class CassetteWriter:
+    """Дописывание взаимодействий в кассету и построение индекса"""
+
+    def __init__(self, path, seed):
+        self.path = path
+        self.index = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+        self._write_line({"version": FORMAT_VERSION, "seed": seed})
+
+    def _write_line(self, data):
+        offset = self._file.tell()
+        self._file.write(json.dumps(data, ensure_ascii=False).encode() + b"\n")
+        return offset
+
+    def record(self, request, response):
+        entry = {
+            "key": request_key(request.method, request.url, request.body),
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            **_encode_body(response.content),
+        }
+        with self._lock:
+            offset = self._write_line(entry)
+            self.index.setdefault(entry["key"], []).append(offset)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            with open(f"{self.path}.idx", "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+
+
+class CassetteReader:
+    """Поиск записанных ответов через индекс и mmap"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.meta = self._entry_at(0)
+        self.index = self._load_index(path)
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    def _load_index(self, path):
+        try:
+            with open(f"{path}.idx", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+        # Индекса нет: один проход по строкам кассеты
+        index = {}
+        offset = self._map.find(b"\n") + 1
+        while 0 < offset < len(self._map):
+            index.setdefault(self._entry_at(offset)["key"], []).append(offset)
+            offset = self._map.find(b"\n", offset) + 1
+        return index
+
+    def _entry_at(self, offset):
+        end = self._map.find(b"\n", offset)
+        return json.loads(self._map[offset:end if end != -1 else len(self._map)])
+
+    def lookup(self, method, url, body):
+        key = request_key(method, url, body)
+        offsets = self.index.get(key)
+        if not offsets:
+            return None
+        with self._lock:
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = position + 1
+        return self._entry_at(offsets[min(position, len(offsets) - 1)])
+
+
+class RecordingAdapter(BaseAdapter):
+    """Транспорт, записывающий ответы основного адаптера в кассету"""
+
+    def __init__(self, inner, writer):
+        super().__init__()
+        self.inner = inner
+        self.writer = writer
+
+    def send(self, request, **kwargs):
+        response = self.inner.send(request, **kwargs)
+        self.writer.record(request, response)
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Транспорт, отдающий ответы из кассеты без сети"""
+
+    def __init__(self, reader):
+        super().__init__()
+        self.reader = reader
+
+    def send(self, request, **kwargs):
+        entry = self.reader.lookup(request.method, request.url, request.body)
+        if entry is None:
+            raise CassetteMiss(f"Нет записи в кассете: {request.method} {request.url}", request=request)
+        response = Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(_decode_body(entry))
+        response.reason = ""
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def install(http, path, mode):
+    """Подключение кассеты к ApiClient в режиме record или replay"""
+    if mode == "replay":
+        reader = CassetteReader(path)
+        config.SEED = reader.meta["seed"]
+        adapter = ReplayAdapter(reader)
+        closer = None
+    elif mode == "record":
+        if config.SEED is None:
+            config.SEED = random.randrange(2 ** 32)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        writer = CassetteWriter(path, config.SEED)
+        adapter = RecordingAdapter(http.adapter, writer)
+        closer = writer.close
+    else:
+        raise ValueError(f"Неизвестный режим кассеты: {mode}")
+    http.session.mount("http://", adapter)
+    http.session.mount("https://", adapter)
+    return closer
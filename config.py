@@ -0,0 +1,125 @@
+"""Настройки тестового окружения
+
+Значение берётся из переменной окружения API_<ИМЯ>, затем из секции профиля
+в файле настроек, затем из секции [default] файла, затем из значения по
+умолчанию ниже. Файл - API_CONFIG или autotests.ini рядом с этим модулем,
+профиль - API_PROFILE:
+
+    [default]
+    admin_login = admin
+
+    [staging]
+    base_url = https://staging.example.com/api/v1
+    pool_maxsize = 50
+    timeout = 30
+"""
+import configparser
+import os
+import tempfile
+import uuid
+
+CONFIG_FILE = os.environ.get(
+    "API_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "autotests.ini"),
+)
+PROFILE = os.environ.get("API_PROFILE", "default")
+
+_parser = configparser.ConfigParser(default_section="default", interpolation=None)
+_parser.read(CONFIG_FILE, encoding="utf-8")
+_section = _parser[PROFILE] if _parser.has_section(PROFILE) else _parser["default"]
+
+
+def _get(name, default):
+    """Значение настройки с приведением к типу значения по умолчанию"""
+    value = os.environ.get(f"API_{name}", _section.get(name.lower()))
+    if value is None:
+        return default
+    if not isinstance(default, str):
+        return type(default)(value)
+    return value
+
+
+# Пул соединений HTTP-клиента
+POOL_CONNECTIONS = _get("POOL_CONNECTIONS", 4)
+POOL_MAXSIZE = _get("POOL_MAXSIZE", 10)
+
+# Таймаут запроса в секундах и политика повторов
+TIMEOUT = _get("TIMEOUT", 10.0)
+RETRIES = _get("RETRIES", 2)
+RETRY_BACKOFF = _get("RETRY_BACKOFF", 0.2)
+
+BASE_URL = _get("BASE_URL", "http://localhost:8080/api/v1")
+
+# Учётная запись администратора, под которой работают тесты
+ADMIN_LOGIN = _get("ADMIN_LOGIN", "admin")
+ADMIN_PASSWORD = _get("ADMIN_PASSWORD", "Admin123!")
+ADMIN_EMAIL = _get("ADMIN_EMAIL", "admin@example.com")
+
+# real - внешний бэкенд по BASE_URL, stub - заглушка stub_server в этом процессе.
+# Адрес заглушки попадает в окружение, дочерние процессы используют её же.
+BACKEND = _get("BACKEND", "real")
+# Заглушка, запущенная этим процессом; None - её адрес получен из окружения
+STUB_SERVER = None
+if BACKEND == "stub" and "API_BASE_URL" not in os.environ:
+    import stub_server
+
+    STUB_SERVER = stub_server.StubServer()
+    BASE_URL = STUB_SERVER.start()
+    os.environ["API_BASE_URL"] = BASE_URL
+
+# Кассета запросов: record - запись ответов сервера, replay - ответы без сети
+CASSETTE = _get("CASSETTE", "")
+CASSETTE_MODE = _get("CASSETTE_MODE", "replay")
+
+# Seed случайных данных тестов, при записи кассеты сохраняется в ней
+SEED = _get("SEED", "")
+SEED = int(SEED) if SEED else None
+
+# Кэш токенов: общий файл для всех процессов, пустое значение отключает.
+# С кассетой выключен, чтобы логин попадал в запись.
+TOKEN_CACHE_FILE = _get(
+    "TOKEN_CACHE",
+    "" if CASSETTE else os.path.join(tempfile.gettempdir(), "autotests_tokens.json"),
+)
+# Идентификатор прогона: записи кэша токенов других прогонов не используются.
+# Попадает в окружение, поэтому рабочие процессы прогона получают тот же
+RUN_ID = os.environ.setdefault("API_RUN_ID", uuid.uuid4().hex)
+# Время жизни токена, если его нельзя прочитать из JWT, и запас на продление
+TOKEN_TTL = _get("TOKEN_TTL", 300.0)
+TOKEN_RENEW_MARGIN = _get("TOKEN_RENEW_MARGIN", 30.0)
+
+# Предел одновременных запросов в асинхронных тестах
+MAX_IN_FLIGHT = _get("MAX_IN_FLIGHT", POOL_MAXSIZE)
+
+# Отчёт по времени запросов: путь без расширения, пишутся .json и .csv
+METRICS_REPORT = _get("METRICS_REPORT", "")
+
+# Бюджеты задержки: fail - падение теста, warn - предупреждение, off - без проверки
+BUDGET_MODE = _get("BUDGET_MODE", "fail")
+# Число повторов теста для оценки перцентиля
+BUDGET_SAMPLES = _get("BUDGET_SAMPLES", 5)
+
+# Тестовые данные: число параллельных запросов и каталог манифестов созданных записей
+SEED_WORKERS = _get("SEED_WORKERS", 8)
+SEED_MANIFEST_DIR = _get("SEED_MANIFEST_DIR", os.path.join(tempfile.gettempdir(), "autotests_seed"))
+
+# Приёмники результатов через запятую: console, jsonl:путь, junit:путь.
+# Пусто - прежний вывод print
+RESULT_SINKS = _get("RESULT_SINKS", "")
+# Тела ответов длиннее предела обрезаются, в запись добавляется sha256 полного тела
+RESULT_BODY_LIMIT = _get("RESULT_BODY_LIMIT", 2000)
+# Фоновая запись: размер пачки и наибольшая задержка сброса, секунды
+RESULT_BATCH_SIZE = _get("RESULT_BATCH_SIZE", 200)
+RESULT_FLUSH_INTERVAL = _get("RESULT_FLUSH_INTERVAL", 0.5)
+
+# Выбор тестов по кэшу: файл индекса результатов и адрес для отпечатка версии
+# сервера (например, /v3/api-docs; относительный путь считается от BASE_URL)
+SELECTION_INDEX = _get("SELECTION_INDEX", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".test_index.json"))
+FINGERPRINT_URL = _get("FINGERPRINT_URL", "")
+
+# Внедрение сетевых сбоев, например latency=80,jitter=40,drop=0.02,errors=0.05,burst=3
+# (описание параметров в faults.py). Пусто - без сбоев
+FAULTS = _get("FAULTS", "")
+# Ограничение частоты запросов общего клиента, запросов в секунду; 0 - без ограничения
+RATE_LIMIT = _get("RATE_LIMIT", 0.0)
+RATE_BURST = _get("RATE_BURST", 1)
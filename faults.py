@@ -0,0 +1,196 @@
+"""Транспорт с внедрением сетевых сбоев
+
+FaultInjectingAdapter монтируется в сессию ApiClient поверх текущего
+транспорта (обычного пула или кассеты) и на каждую попытку запроса
+добавляет задержку с разбросом, ограничивает скорость чтения тела, рвёт
+соединения и отдаёт серии ответов 503. Повторы по политике клиента (Retry)
+переносятся в этот адаптер, чтобы внедрённые сбои проходили через тот же
+механизм повторов, что и настоящие.
+
+Профиль задаётся строкой, например в API_FAULTS:
+
+    latency=80,jitter=40,bandwidth=256,drop=0.02,errors=0.05,burst=3,seed=1
+
+latency и jitter - миллисекунды, bandwidth - КБ/с, drop и errors -
+вероятности на попытку, burst - длина серии ответов 503.
+"""
+import io
+import json
+import random
+import threading
+import time
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+from urllib3.response import HTTPResponse
+from urllib3.util.retry import Retry
+
+INJECTED_BODY = json.dumps({"message": "Сбой внедрён транспортом"}).encode()
+
+
+class FaultProfile:
+    """Параметры деградации сети"""
+
+    FIELDS = {
+        "latency": float, "jitter": float, "bandwidth": float,
+        "drop": float, "errors": float, "burst": int, "seed": int,
+    }
+
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=0.0, drop=0.0,
+                 errors=0.0, burst=1, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.drop = drop
+        self.errors = errors
+        self.burst = burst
+        self.seed = seed
+
+    @classmethod
+    def parse(cls, spec):
+        """Профиль из строки вида latency=50,drop=0.01"""
+        values = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, _, value = item.partition("=")
+            if name not in cls.FIELDS:
+                raise ValueError(f"Неизвестный параметр сбоев: {name}")
+            values[name] = cls.FIELDS[name](value)
+        return cls(**values)
+
+    def __str__(self):
+        defaults = FaultProfile()
+        changed = [f"{name}={getattr(self, name):g}" for name in self.FIELDS
+                   if getattr(self, name) != getattr(defaults, name)]
+        return ",".join(changed) or "без сбоев"
+
+
+class _ThrottledRaw:
+    """Тело ответа, читаемое не быстрее bandwidth байт в секунду"""
+
+    def __init__(self, raw, bandwidth):
+        self._raw = raw
+        self._bandwidth = bandwidth
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def read(self, amt=None, *args, **kwargs):
+        data = self._raw.read(amt, *args, **kwargs)
+        time.sleep(len(data) / self._bandwidth)
+        return data
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            time.sleep(len(chunk) / self._bandwidth)
+            yield chunk
+
+
+class FaultInjectingAdapter(BaseAdapter):
+    """Транспорт-обёртка: сбои на каждую попытку и повторы по Retry"""
+
+    def __init__(self, inner, profile, retry=None):
+        super().__init__()
+        self.inner = inner
+        self.profile = profile
+        self.retry = retry if retry is not None else Retry(0, read=False)
+        self.stats = {"attempts": 0, "retries": 0, "dropped": 0, "injected_5xx": 0, "timeouts": 0}
+        self._rng = random.Random(profile.seed)
+        self._burst_left = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _roll(self):
+        """Решение о сбое для попытки: задержка, обрыв и ответ 503"""
+        profile = self.profile
+        with self._lock:
+            delay = max(profile.latency + self._rng.uniform(-profile.jitter, profile.jitter), 0.0) / 1000
+            dropped = self._rng.random() < profile.drop
+            if not self._burst_left and self._rng.random() < profile.errors:
+                self._burst_left = profile.burst
+            injected = self._burst_left > 0
+            if injected:
+                self._burst_left -= 1
+        return delay, dropped, injected
+
+    def _attempt(self, request, timeout, **kwargs):
+        self._count("attempts")
+        delay, dropped, injected = self._roll()
+        connect_timeout = timeout[0] if isinstance(timeout, tuple) else timeout
+        if connect_timeout is not None and delay >= connect_timeout:
+            time.sleep(connect_timeout)
+            self._count("timeouts")
+            raise ConnectTimeoutError(None, f"Внедрённая задержка {delay * 1000:.0f} мс больше таймаута")
+        time.sleep(delay)
+        if dropped:
+            self._count("dropped")
+            raise NewConnectionError(None, "Соединение сброшено транспортом")
+        if injected:
+            self._count("injected_5xx")
+            return self._injected_response(request)
+        response = self.inner.send(request, timeout=timeout, **kwargs)
+        if self.profile.bandwidth and response.raw is not None:
+            response.raw = _ThrottledRaw(response.raw, self.profile.bandwidth * 1024)
+        return response
+
+    def _injected_response(self, request):
+        response = Response()
+        response.status_code = 503
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.encoding = "utf-8"
+        response.raw = HTTPResponse(body=io.BytesIO(INJECTED_BODY), status=503,
+                                    headers=dict(response.headers), preload_content=False)
+        response.reason = "Service Unavailable"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def send(self, request, timeout=None, **kwargs):
+        retry = self.retry
+        while True:
+            try:
+                response = self._attempt(request, timeout, **kwargs)
+            except (ConnectTimeoutError, NewConnectionError) as error:
+                try:
+                    retry = retry.increment(request.method, request.url, error=error)
+                except MaxRetryError:
+                    if isinstance(error, NewConnectionError):
+                        raise ConnectionError(error, request=request)
+                    raise ConnectTimeout(error, request=request)
+                self._count("retries")
+                retry.sleep()
+                continue
+
+            has_retry_after = "Retry-After" in response.headers
+            if not retry.is_retry(request.method, response.status_code, has_retry_after):
+                return response
+            # Ответ кассеты - BytesIO без статуса и заголовков urllib3
+            raw = response.raw if hasattr(response.raw, "status") else None
+            try:
+                retry = retry.increment(request.method, request.url, response=raw)
+            except MaxRetryError:
+                # Как при raise_on_status=False: повторы исчерпаны, отдаём последний ответ
+                return response
+            self._count("retries")
+            response.close()
+            retry.sleep(raw)
+
+    def close(self):
+        self.inner.close()
+
+
+def install(http, profile):
+    """Подключение сбоев к ApiClient, возвращает адаптер со статистикой"""
+    inner = http.session.get_adapter("http://")
+    retry = http.adapter.max_retries
+    # Внутренний пул больше не повторяет сам, иначе повторы удвоятся
+    http.adapter.max_retries = Retry(0, read=False)
+    adapter = FaultInjectingAdapter(inner, profile, retry)
+    http.session.mount("http://", adapter)
+    http.session.mount("https://", adapter)
+    return adapter
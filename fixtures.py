@@ -0,0 +1,75 @@
+"""Общие фикстуры и базовый класс тестов API"""
+import functools
+import threading
+import unittest
+
+import config
+from auth import tokens
+
+
+def session_fixture(func):
+    """Фикстура на весь прогон: вычисляется при первом обращении и кэшируется
+
+    Потокобезопасна, reset() сбрасывает сохранённое значение.
+    """
+    lock = threading.Lock()
+    state = {}
+
+    @functools.wraps(func)
+    def fixture():
+        with lock:
+            if "value" not in state:
+                state["value"] = func()
+            return state["value"]
+
+    def reset():
+        with lock:
+            state.clear()
+
+    fixture.reset = reset
+    return fixture
+
+
+def admin_token():
+    """Access token администратора из config
+
+    Токен кэшируется на весь прогон в auth.tokens и продлевается там же.
+    """
+    return tokens.access_token(config.ADMIN_LOGIN, config.ADMIN_PASSWORD)
+
+
+def isolated_admin_tokens():
+    """Отдельная пара токенов администратора для тестов, завершающих сеансы"""
+    return tokens.isolated(config.ADMIN_LOGIN, config.ADMIN_PASSWORD)
+
+
+def invalidate_admin_token():
+    """Сброс кэша после отзыва сеансов администратора"""
+    tokens.invalidate(config.ADMIN_LOGIN, config.ADMIN_PASSWORD)
+
+
+def auth_headers(access_token):
+    """Заголовки JSON-запроса с Bearer-токеном"""
+    return {
+        "accept": "application/json",
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {access_token}"
+    }
+
+
+class ApiTestCase(unittest.TestCase):
+    """Базовый класс тестов, работающих под администратором"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Получение токена перед всеми тестами"""
+        admin_token()
+
+    @property
+    def access_token(self):
+        """Действующий токен: при каждом обращении из кэша, продлённый при необходимости"""
+        return admin_token()
+
+    @property
+    def user_headers(self):
+        return auth_headers(self.access_token)
@@ -0,0 +1,173 @@
+"""Нагрузочный режим: существующие тесты как взвешенные сценарии трафика
+
+Каждый виртуальный пользователь в своём потоке выбирает сценарий по весам
+и запускает соответствующий тест. Частота HTTP-запросов ограничивается
+общим TokenBucket клиента, по каждому эндпоинту считаются пропускная
+способность и перцентили задержки.
+
+    python load.py --users 20 --rps 100 --duration 60
+    python load.py -s test_Auth.AuthAPITests.test_01_login_success=3 \\
+                   -s test_user_info.UserInfoPositiveTests.test_get_user_role_success=1
+"""
+import argparse
+import importlib
+import random
+import sys
+import threading
+import time
+import unittest
+
+import config
+from api_client import TokenBucket, client
+from metrics import endpoint_template, percentile
+from test_utils import TestOutput
+
+# Сценарии по умолчанию: только тесты без побочных эффектов для других
+DEFAULT_SCENARIOS = {
+    "test_Auth.AuthAPITests.test_01_login_success": 3,
+    "test_Auth.AuthAPITests.test_02_refresh_token_success": 1,
+    "test_recovery.RecoveryPositiveTests.test_reset_password_success": 1,
+    "test_admin_user.AdminUsersPositiveTests.test_get_all_users_info_success": 2,
+    "test_admin_user.AdminUsersPositiveTests.test_get_user_info_by_id_success": 2,
+    "test_admin_user.AdminUsersPositiveTests.test_get_all_users_with_username_filter_success": 1,
+    "test_user_info.UserInfoPositiveTests.test_get_user_profile_info_success": 3,
+    "test_user_info.UserInfoPositiveTests.test_get_all_sessions_success": 1,
+    "test_super_admin.SuperAdminPositiveTests.test_get_all_admins_info_success": 1,
+}
+
+
+class Scenario:
+    """Тестовый метод, запускаемый как единица нагрузки"""
+
+    def __init__(self, name, weight):
+        module_name, class_name, method = name.rsplit(".", 2)
+        self.name = name
+        self.weight = weight
+        self.test_class = getattr(importlib.import_module(module_name), class_name)
+        self.method = method
+
+    def run(self):
+        """Запуск теста, True при успехе"""
+        result = unittest.TestResult()
+        self.test_class(self.method).run(result)
+        return result.wasSuccessful()
+
+
+class LoadStats:
+    """Потокобезопасный сбор задержек по эндпоинтам и итогов сценариев"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.scenarios = {}
+        self._lock = threading.Lock()
+
+    def on_request(self, method, url, response, elapsed):
+        endpoint = f"{method} {endpoint_template(url)}"
+        failed = response is None or response.status_code >= 500
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + failed
+
+    def on_scenario(self, name, passed):
+        with self._lock:
+            passed_count, failed_count = self.scenarios.get(name, (0, 0))
+            self.scenarios[name] = (passed_count + passed, failed_count + (not passed))
+
+    def report(self, duration, stream=sys.stdout):
+        total = sum(len(values) for values in self.latencies.values())
+        stream.write(
+            f"\nДлительность: {duration:.1f} с, запросов: {total}"
+            f", пропускная способность: {total / duration:.1f} RPS\n"
+        )
+        stream.write(
+            f"\n{'Эндпоинт':<55}{'Запросов':>9}{'Ошибок':>8}{'RPS':>8}"
+            f"{'p50, мс':>9}{'p95, мс':>9}{'p99, мс':>9}\n"
+        )
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            stream.write(
+                f"{endpoint:<55}{len(values):>9}{self.errors[endpoint]:>8}"
+                f"{len(values) / duration:>8.1f}"
+                f"{percentile(values, 50) * 1000:>9.1f}"
+                f"{percentile(values, 95) * 1000:>9.1f}"
+                f"{percentile(values, 99) * 1000:>9.1f}\n"
+            )
+        stream.write("\nСценарии (успешно / провалено):\n")
+        for name, (passed, failed) in sorted(self.scenarios.items()):
+            stream.write(f"  {name}: {passed} / {failed}\n")
+
+
+def _virtual_user(scenarios, stats, deadline, seed):
+    rng = random.Random(seed)
+    weights = [scenario.weight for scenario in scenarios]
+    while time.monotonic() < deadline:
+        scenario = rng.choices(scenarios, weights)[0]
+        stats.on_scenario(scenario.name, scenario.run())
+
+
+def run_load(scenarios, users=10, rps=None, duration=30, stats=None):
+    """Нагрузка заданным числом виртуальных пользователей, возвращает LoadStats
+
+    Вместо LoadStats можно передать свой сборщик с методами on_request и
+    on_scenario.
+    """
+    test_classes = {scenario.test_class for scenario in scenarios}
+    for test_class in test_classes:
+        test_class.setUpClass()
+
+    stats = stats if stats is not None else LoadStats()
+    output_enabled = TestOutput.enabled
+    TestOutput.enabled = False
+    # Повторы ради бюджетов задержки исказили бы веса сценариев
+    budget_mode = config.BUDGET_MODE
+    config.BUDGET_MODE = "off"
+    rate_limiter = client.rate_limiter
+    if rps:
+        client.rate_limiter = TokenBucket(rps, burst=max(users, 1))
+    client.add_listener(stats.on_request)
+    try:
+        deadline = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=_virtual_user, args=(scenarios, stats, deadline, seed), daemon=True)
+            for seed in range(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        client.remove_listener(stats.on_request)
+        client.rate_limiter = rate_limiter
+        TestOutput.enabled = output_enabled
+        config.BUDGET_MODE = budget_mode
+        for test_class in test_classes:
+            test_class.tearDownClass()
+    return stats
+
+
+def _parse_scenario(value):
+    name, _, weight = value.partition("=")
+    return name, float(weight or 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-u", "--users", type=int, default=10, help="виртуальных пользователей")
+    parser.add_argument("-r", "--rps", type=float, help="целевое число запросов в секунду")
+    parser.add_argument("-d", "--duration", type=float, default=30, help="длительность, с")
+    parser.add_argument("-s", "--scenario", action="append", type=_parse_scenario,
+                        help="модуль.Класс.метод=вес, можно указать несколько раз")
+    args = parser.parse_args(argv)
+
+    weights = dict(args.scenario) if args.scenario else DEFAULT_SCENARIOS
+    scenarios = [Scenario(name, weight) for name, weight in weights.items()]
+
+    start = time.monotonic()
+    stats = run_load(scenarios, args.users, args.rps, args.duration)
+    stats.report(time.monotonic() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
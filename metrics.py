@@ -0,0 +1,201 @@
+"""Замеры времени запросов и отчёт по эндпоинтам"""
+import atexit
+import bisect
+import csv
+import glob
+import json
+import math
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+import config
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def endpoint_template(url, base_url=config.BASE_URL):
+    """Шаблон эндпоинта без хоста и параметров: /admin/info/user/{id}"""
+    path = urlsplit(url).path
+    base_path = urlsplit(base_url).path.rstrip("/")
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    segments = ["{id}" if _ID_SEGMENT.match(part) else part for part in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+def percentile(sorted_values, q):
+    """Перцентиль q (0-100) по отсортированным значениям, ближайший ранг"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def linear_trend(points):
+    """Наклон и свободный член прямой y = a*x + b по методу наименьших
+    квадратов, None при меньше чем двух различных x"""
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+    return slope, mean_y - slope * mean_x
+
+
+# Границы корзин гистограммы в миллисекундах, последняя корзина открытая
+HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+RECORD_FIELDS = ("method", "endpoint", "url", "status", "ttfb_ms", "total_ms", "size")
+
+
+def _body_size(response):
+    length = response.headers.get("Content-Length")
+    if length is not None:
+        return int(length)
+    # Тело потокового ответа ещё не прочитано, читать его здесь нельзя
+    if not response._content_consumed:
+        return None
+    if response._content is False:
+        # Потоковый ответ прочитан через iter_content: размер по счётчику транспорта
+        return response.raw.tell()
+    return len(response.content)
+
+
+class RequestRecorder:
+    """Запись каждого запроса клиента для итогового отчёта"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def attach(self, http):
+        http.add_listener(self.on_request)
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+
+    def on_request(self, method, url, response, elapsed):
+        record = {
+            "method": method,
+            "endpoint": endpoint_template(url),
+            "url": url,
+            "status": None,
+            "ttfb_ms": None,
+            "total_ms": round(elapsed * 1000, 3),
+            "size": None,
+        }
+        if response is not None:
+            record["status"] = response.status_code
+            record["ttfb_ms"] = round(response.elapsed.total_seconds() * 1000, 3)
+            record["size"] = _body_size(response)
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self):
+        """Сводка по эндпоинтам: перцентили и гистограмма полного времени"""
+        with self._lock:
+            records = list(self.records)
+        grouped = {}
+        for record in records:
+            grouped.setdefault(f"{record['method']} {record['endpoint']}", []).append(record)
+
+        summary = {}
+        for endpoint, items in sorted(grouped.items()):
+            totals = sorted(item["total_ms"] for item in items)
+            ttfbs = sorted(item["ttfb_ms"] for item in items if item["ttfb_ms"] is not None)
+            sizes = [item["size"] for item in items if item["size"] is not None]
+            buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            for total in totals:
+                buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, total)] += 1
+            statuses = {}
+            for item in items:
+                statuses[str(item["status"])] = statuses.get(str(item["status"]), 0) + 1
+            summary[endpoint] = {
+                "count": len(items),
+                "statuses": statuses,
+                "total_ms": {q: percentile(totals, n) for q, n in (("p50", 50), ("p95", 95), ("p99", 99))},
+                "ttfb_ms": {q: percentile(ttfbs, n) for q, n in (("p50", 50), ("p95", 95), ("p99", 99))},
+                "max_ms": totals[-1],
+                "avg_size": sum(sizes) / len(sizes) if sizes else None,
+                "histogram": {
+                    "bounds_ms": list(HISTOGRAM_BOUNDS_MS),
+                    "counts": buckets,
+                },
+            }
+        return summary
+
+    def write_part(self, path):
+        """Записи рабочего процесса в отдельный файл, их сводит write_report родителя"""
+        with self._lock:
+            records = list(self.records)
+        if not records:
+            return
+        tmp_path = f"{_part_prefix(path)}{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        os.replace(tmp_path, f"{_part_prefix(path)}{os.getpid()}.json")
+
+    def merge_parts(self, path):
+        """Добавление записей рабочих процессов этого прогона, файлы частей удаляются"""
+        for part in sorted(glob.glob(f"{_part_prefix(path)}*.json")):
+            try:
+                with open(part, encoding="utf-8") as f:
+                    records = json.load(f)
+            except (OSError, ValueError):
+                continue
+            with self._lock:
+                self.records.extend(records)
+            os.remove(part)
+
+    def write_report(self, path):
+        """Запись отчёта: path.json со сводкой и path.csv со всеми запросами
+
+        Перед записью добавляются записи рабочих процессов прогона.
+        """
+        self.merge_parts(path)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({"endpoints": self.summary()}, f, ensure_ascii=False, indent=2)
+        with self._lock:
+            records = list(self.records)
+        with open(f"{path}.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+
+
+def _part_prefix(path):
+    return f"{path}.{config.RUN_ID}.part-"
+
+
+def report_on_exit(http, path, request_recorder=None):
+    """Запись отчёта при завершении прогона, в том числе с рабочими процессами
+
+    Рабочие процессы пула завершаются без atexit: каждый пишет свою часть
+    при выходе через multiprocessing.util.Finalize, а родитель сводит части
+    в общий отчёт. Процесс, полученный fork от родителя, начинает с пустых
+    записей, чтобы запросы родителя не попали в отчёт дважды.
+    """
+    import multiprocessing
+    import multiprocessing.util
+
+    request_recorder = request_recorder or recorder
+    request_recorder.attach(http)
+
+    def start_worker(worker_recorder):
+        worker_recorder.reset()
+        multiprocessing.util.Finalize(None, worker_recorder.write_part, args=(path,), exitpriority=10)
+
+    if multiprocessing.parent_process() is None:
+        atexit.register(request_recorder.write_report, path)
+        multiprocessing.util.register_after_fork(request_recorder, start_worker)
+    else:
+        multiprocessing.util.Finalize(None, request_recorder.write_part, args=(path,), exitpriority=10)
+
+
+recorder = RequestRecorder()
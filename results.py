@@ -0,0 +1,219 @@
+"""Конвейер результатов тестов с фоновой записью
+
+Записи о запросах и исходах тестов кладутся в очередь, фоновый поток
+забирает их пачками и передаёт приёмникам. В потоке теста остаётся только
+создание словаря и put в очередь: декодирование, обрезка и хеширование
+тела выполняются в фоновом потоке. Приёмники задаются в
+config.RESULT_SINKS через запятую:
+
+    console                 - краткая строка на запрос и итог прогона
+    jsonl:results.jsonl     - все записи построчно
+    junit:results.xml       - исходы тестов в формате JUnit XML
+
+Если приёмники не заданы, TestOutput печатает результаты как раньше.
+"""
+import atexit
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import config
+
+_STOP = object()
+
+
+def prepare(record, body_limit=config.RESULT_BODY_LIMIT):
+    """Замена сырого тела ответа на текст с ограничением размера и хешем"""
+    body = record.pop("body", None)
+    if body is None:
+        return record
+    record["bodySize"] = len(body)
+    if len(body) > body_limit:
+        record["bodySha256"] = hashlib.sha256(body).hexdigest()
+        body = body[:body_limit]
+        record["truncated"] = True
+    record["body"] = body.decode("utf-8", "replace")
+    return record
+
+
+class JsonlSink:
+    """Построчная запись в JSONL, одна запись на пачку в режиме append"""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, records):
+        self._file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JUnitXmlSink:
+    """Исходы тестов в формате JUnit XML, файл пишется при закрытии"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tests = []
+
+    def write_batch(self, records):
+        self.tests.extend(record for record in records if record["type"] == "test")
+
+    def close(self):
+        # Рабочие процессы без исходов тестов не перезаписывают файл родителя
+        if not self.tests:
+            return
+        from xml.etree import ElementTree
+
+        by_suite = {}
+        for record in self.tests:
+            suite_name, _, name = record["test"].rpartition(".")
+            by_suite.setdefault(suite_name, []).append((name, record))
+
+        root = ElementTree.Element("testsuites")
+        for suite_name, cases in by_suite.items():
+            suite = ElementTree.SubElement(root, "testsuite", {
+                "name": suite_name,
+                "tests": str(len(cases)),
+                "failures": str(sum(r["outcome"] == "failure" for _, r in cases)),
+                "errors": str(sum(r["outcome"] == "error" for _, r in cases)),
+                "skipped": str(sum(r["outcome"] == "skipped" for _, r in cases)),
+                "time": f"{sum(r['duration'] for _, r in cases):.3f}",
+            })
+            for name, record in cases:
+                case = ElementTree.SubElement(suite, "testcase", {
+                    "classname": suite_name, "name": name, "time": f"{record['duration']:.3f}",
+                })
+                if record["outcome"] in ("failure", "error", "skipped"):
+                    detail = ElementTree.SubElement(case, record["outcome"])
+                    detail.text = record.get("message", "")
+        ElementTree.ElementTree(root).write(self.path, encoding="utf-8", xml_declaration=True)
+
+
+class ConsoleSink:
+    """Краткий вывод: строка на запрос и сводка по исходам в конце"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.outcomes = {}
+        self.responses = 0
+
+    def write_batch(self, records):
+        lines = []
+        for record in records:
+            if record["type"] == "test":
+                self.outcomes[record["outcome"]] = self.outcomes.get(record["outcome"], 0) + 1
+                if record["outcome"] in ("failure", "error"):
+                    lines.append(f"{record['outcome'].upper()}: {record['test']}")
+                continue
+            self.responses += 1
+            size = record.get("bodySize", record.get("count", ""))
+            lines.append(f"{record['test']}: {record['status']} ({size})")
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+    def close(self):
+        if self.outcomes:
+            totals = ", ".join(f"{name}: {count}" for name, count in sorted(self.outcomes.items()))
+            self.stream.write(f"Ответов: {self.responses}; тесты - {totals}\n")
+            self.stream.flush()
+
+
+SINKS = {"console": ConsoleSink, "jsonl": JsonlSink, "junit": JUnitXmlSink}
+
+
+def create_sinks(spec):
+    """Приёмники по строке вида console,jsonl:path,junit:path"""
+    sinks = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, path = item.partition(":")
+        sinks.append(SINKS[name](path) if path else SINKS[name]())
+    return sinks
+
+
+class AsyncResultWriter:
+    """Очередь записей и фоновый поток, передающий их приёмникам пачками"""
+
+    def __init__(self, sinks, batch_size=config.RESULT_BATCH_SIZE,
+                 flush_interval=config.RESULT_FLUSH_INTERVAL):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        record.setdefault("time", time.time())
+        record.setdefault("pid", os.getpid())
+        self._queue.put(record)
+
+    def _drain(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                self._write(batch)
+                return
+            if record is not None:
+                batch.append(prepare(record))
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch):
+        if not batch:
+            return
+        for sink in self.sinks:
+            sink.write_batch(batch)
+
+    def close(self):
+        """Запись остатка очереди и закрытие приёмников"""
+        self._queue.put(_STOP)
+        self._thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def writer():
+    """Общий писатель процесса или None, если приёмники не заданы"""
+    global _writer
+    if not config.RESULT_SINKS:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            import multiprocessing
+            import multiprocessing.util
+
+            _writer = AsyncResultWriter(create_sinks(config.RESULT_SINKS))
+            if multiprocessing.parent_process() is None:
+                atexit.register(_writer.close)
+            else:
+                # Рабочие процессы пула завершаются без atexit
+                multiprocessing.util.Finalize(None, _writer.close, exitpriority=10)
+        return _writer
+
+
+def submit_test(test_id, outcome, duration, message=""):
+    """Запись исхода теста, если конвейер включён"""
+    result_writer = writer()
+    if result_writer is not None:
+        result_writer.submit({
+            "type": "test", "test": test_id, "outcome": outcome,
+            "duration": duration, "message": message,
+        })
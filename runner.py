@@ -0,0 +1,367 @@
+"""Параллельный запуск наборов тестов с учётом зависимостей между тестами
+
+Единица планирования - класс тестов (setUpClass выполняется один раз),
+с --split method каждый тест без ограничений идёт отдельной единицей.
+Классы с @ordered всегда выполняются целиком в одном потоке, тесты с
+@exclusive - по одному после параллельной фазы.
+
+    python runner.py -w 8
+    python runner.py -w 4 --mode process test_Auth test_user_info
+    python runner.py --changed --order failed-first
+    python runner.py --watch --changed
+
+Все наборы загружаются в одном процессе: requests импортируется один раз,
+токен администратора и сессия с пулом соединений общие. Отчёт о запуске
+показывает время старта интерпретатора и импорта наборов, --startup-budget
+превращает рост этого времени в ошибку прогона.
+"""
+import time
+
+# Отсчёт времени запуска до импорта остальных модулей
+_STARTED = time.perf_counter()
+
+import argparse
+import importlib
+import linecache
+import os
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from results import submit_test
+from selection import TestIndex, select, server_fingerprint, test_key
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HELPER_MODULES = {"test_utils"}
+_RESTARTED_AT = "RUNNER_RESTARTED_AT"
+
+
+def discover_modules():
+    """Имена модулей test_*.py в каталоге проекта"""
+    return sorted(
+        name[:-3] for name in os.listdir(ROOT)
+        if name.startswith("test_") and name.endswith(".py")
+        and name[:-3] not in HELPER_MODULES
+    )
+
+
+def _iter_tests(suite):
+    for item in suite:
+        if isinstance(item, unittest.TestSuite):
+            yield from _iter_tests(item)
+        else:
+            yield item
+
+
+def import_modules(module_names):
+    """Импорт наборов тестов, время импорта каждого в секундах
+
+    Первый импортированный набор включает время загрузки общих зависимостей.
+    """
+    timings = {}
+    for module_name in module_names:
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        timings[module_name] = time.perf_counter() - start
+    return timings
+
+
+def _process_age():
+    """Время с запуска процесса по /proc, None вне Linux"""
+    if _RESTARTED_AT in os.environ:
+        # После exec в режиме наблюдения PID и время старта прежние
+        return time.time() - float(os.environ[_RESTARTED_AT])
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            start_ticks = int(f.read().rpartition(")")[2].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+
+def startup_report(import_times, stream=sys.stdout):
+    """Время от запуска до готовности к прогону, возвращает его в секундах"""
+    ready = time.perf_counter() - _STARTED
+    age = _process_age()
+    interpreter = max(age - ready, 0.0) if age is not None else 0.0
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:3]
+    stream.write(
+        f"Запуск: {interpreter + ready:.3f} с (интерпретатор {interpreter:.3f} с"
+        f", runner и планирование {ready:.3f} с)"
+        f"\nИмпорт наборов: {sum(import_times.values()):.3f} с"
+        f" ({', '.join(f'{name} {seconds:.3f} с' for name, seconds in slowest)})\n"
+    )
+    return interpreter + ready
+
+
+def plan(module_names, split="class"):
+    """Разбиение тестов на единицы (модуль, класс, методы)
+
+    Возвращает параллельные единицы и единицы для последовательного запуска.
+    """
+    parallel, serial = [], []
+    for module_name in module_names:
+        module = importlib.import_module(module_name)
+        suite = unittest.defaultTestLoader.loadTestsFromModule(module)
+        by_class = {}
+        for test in _iter_tests(suite):
+            by_class.setdefault(type(test), []).append(test._testMethodName)
+
+        for cls, methods in by_class.items():
+            if getattr(cls, "exclusive", False):
+                serial.append((module_name, cls.__name__, methods))
+                continue
+            isolated = [m for m in methods if getattr(getattr(cls, m), "exclusive", False)]
+            shared = [m for m in methods if m not in isolated]
+            serial.extend((module_name, cls.__name__, [m]) for m in isolated)
+            if not shared:
+                continue
+            if split == "method" and not getattr(cls, "ordered", False):
+                parallel.extend((module_name, cls.__name__, [m]) for m in shared)
+            else:
+                parallel.append((module_name, cls.__name__, shared))
+    return parallel, serial
+
+
+class _TimedResult(unittest.TestResult):
+    """TestResult с исходом и длительностью каждого теста"""
+
+    def __init__(self):
+        super().__init__()
+        self.tests = []
+        self._started = {}
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+
+    def _outcome(self, test, outcome, message=""):
+        start = self._started.pop(test.id(), None)
+        duration = time.perf_counter() - start if start is not None else 0.0
+        self.tests.append({"test": test.id(), "outcome": outcome,
+                           "duration": duration, "message": message})
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._outcome(test, "success")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._outcome(test, "failure", self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._outcome(test, "error", self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._outcome(test, "skipped", reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._outcome(test, "success")
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._outcome(test, "failure", "unexpected success")
+
+
+def run_unit(unit):
+    """Запуск одной единицы, результат сериализуем для пула процессов"""
+    module_name, class_name, methods = unit
+    cls = getattr(importlib.import_module(module_name), class_name)
+    suite = unittest.TestSuite(cls(method) for method in methods)
+    result = _TimedResult()
+
+    start = time.perf_counter()
+    suite.run(result)
+    return {
+        "unit": f"{module_name}.{class_name}",
+        "run": result.testsRun,
+        "failures": [(str(test), tb) for test, tb in result.failures],
+        "errors": [(str(test), tb) for test, tb in result.errors],
+        "skipped": len(result.skipped),
+        "duration": time.perf_counter() - start,
+        "tests": result.tests,
+    }
+
+
+def execute(parallel, serial, workers=4, mode="thread"):
+    """Параллельная фаза в пуле, затем изолированные тесты по одному"""
+    pool_class = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    if mode == "process":
+        # requests загружается до fork, а не в каждом рабочем процессе
+        import requests  # noqa: F401
+    results = []
+    if parallel:
+        with pool_class(max_workers=workers) as pool:
+            results.extend(pool.map(run_unit, parallel))
+    results.extend(run_unit(unit) for unit in serial)
+    # Исходы пишет родительский процесс, чтобы JUnit XML был один на прогон
+    for result in results:
+        for test in result["tests"]:
+            submit_test(test["test"], test["outcome"], test["duration"], test["message"])
+    return results
+
+
+def _plan_keys(units, fingerprint):
+    return {
+        f"{module_name}.{class_name}.{method}": test_key(module_name, class_name, method, fingerprint)
+        for module_name, class_name, methods in units
+        for method in methods
+    }
+
+
+def report(results, wall_time, stream=sys.stdout):
+    """Сводка прогона и ускорение относительно последовательного запуска"""
+    problems = []
+    for result in results:
+        problems.extend(("FAIL", *item) for item in result["failures"])
+        problems.extend(("ERROR", *item) for item in result["errors"])
+    for kind, test, tb in problems:
+        stream.write(f"\n{'=' * 70}\n{kind}: {test}\n{'-' * 70}\n{tb}")
+
+    serial_time = sum(result["duration"] for result in results)
+    speedup = serial_time / wall_time if wall_time else 0
+    stream.write(
+        f"\nТестов: {sum(r['run'] for r in results)}"
+        f", провалено: {sum(len(r['failures']) for r in results)}"
+        f", ошибок: {sum(len(r['errors']) for r in results)}"
+        f", пропущено: {sum(r['skipped'] for r in results)}"
+        f"\nВремя: {wall_time:.2f} с, последовательно: {serial_time:.2f} с"
+        f", ускорение: x{speedup:.1f}\n"
+    )
+    return not problems
+
+
+def run_once(args, module_names):
+    """Один прогон: план, выбор по кэшу, выполнение и отчёт"""
+    parallel, serial = plan(module_names, args.split)
+    workers = 1 if args.serial else args.workers
+
+    index = TestIndex()
+    keys = _plan_keys(parallel + serial, server_fingerprint())
+    order = args.order == "failed-first"
+    parallel, skipped = select(parallel, index, keys, args.changed, order)
+    serial, skipped_serial = select(serial, index, keys, args.changed, order)
+    skipped += skipped_serial
+    if skipped:
+        print(f"Пропущено по кэшу результатов: {len(skipped)}")
+
+    start = time.perf_counter()
+    results = execute(parallel, serial, workers, args.mode)
+    ok = report(results, time.perf_counter() - start)
+    for result in results:
+        index.record(result["tests"], keys)
+    index.save()
+    return ok
+
+
+def _snapshot():
+    """Время изменения файлов проекта"""
+    return {
+        name: os.stat(os.path.join(ROOT, name)).st_mtime_ns
+        for name in os.listdir(ROOT) if name.endswith(".py")
+    }
+
+
+def _report_error():
+    import traceback
+
+    traceback.print_exc()
+    print("Прогон прерван ошибкой, исправьте файл и сохраните снова")
+
+
+def _watched_run(args, module_names, changed):
+    """Перезагрузка изменённых наборов и прогон; ошибка не завершает процесс"""
+    try:
+        for name in changed:
+            if name in sys.modules:
+                importlib.reload(sys.modules[name])
+            else:
+                importlib.import_module(name)
+        run_once(args, module_names)
+    except Exception:
+        _report_error()
+
+
+def watch(args, module_names, interval=0.5):
+    """Тёплый процесс: повторный прогон при изменении файлов проекта
+
+    Изменённые наборы тестов перезагружаются на месте. При изменении
+    вспомогательного модуля процесс перезапускается: клиент, фикстуры и
+    кэши модулей держат состояние, которое reload не обновит. Ошибка в
+    сохранённом файле (SyntaxError, ImportError, сбой прогона) выводится,
+    и процесс ждёт следующего изменения.
+    """
+    snapshot = _snapshot()
+    while True:
+        print("\nОжидание изменений (Ctrl+C - выход)...")
+        while True:
+            time.sleep(interval)
+            current = _snapshot()
+            changed = {name for name in current.keys() | snapshot.keys()
+                       if current.get(name) != snapshot.get(name)}
+            if changed:
+                break
+        snapshot = current
+        modules = {name[:-3] for name in changed}
+        if any(not name.startswith("test_") or name in HELPER_MODULES for name in modules):
+            print(f"Изменены модули {', '.join(sorted(modules))}, перезапуск")
+            os.environ[_RESTARTED_AT] = repr(time.time())
+            import config
+
+            if config.STUB_SERVER is not None:
+                # Заглушка живёт в этом процессе и не переживёт exec, новый процесс поднимет свою
+                del os.environ["API_BASE_URL"]
+            os.execv(sys.executable, [sys.executable, *sys.argv])
+        linecache.checkcache()
+        if not args.modules:
+            module_names = discover_modules()
+        _watched_run(args, module_names, [name for name in sorted(modules) if name in module_names])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="модули тестов, по умолчанию все test_*.py")
+    parser.add_argument("-w", "--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--split", choices=("class", "method"), default="class")
+    parser.add_argument("--serial", action="store_true",
+                        help="последовательный прогон для сравнения")
+    parser.add_argument("--changed", action="store_true",
+                        help="пропустить тесты, прошедшие с теми же кодом и версией сервера")
+    parser.add_argument("--order", choices=("plan", "failed-first"), default="plan",
+                        help="failed-first: сначала упавшие и новые, затем самые долгие")
+    parser.add_argument("--watch", action="store_true",
+                        help="не завершаться, повторять прогон при изменении файлов")
+    parser.add_argument("--startup-budget", type=float, default=0.0,
+                        help="допустимое время запуска в секундах, 0 - без проверки")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    module_names = args.modules or discover_modules()
+    try:
+        startup = startup_report(import_modules(module_names))
+        over_budget = args.startup_budget and startup > args.startup_budget
+        if over_budget:
+            print(f"Время запуска {startup:.3f} с превышает бюджет {args.startup_budget:.3f} с")
+        ok = run_once(args, module_names)
+    except Exception:
+        # После перезапуска с ошибкой во вспомогательном модуле ждём исправления
+        if not args.watch:
+            raise
+        _report_error()
+        ok = over_budget = False
+    if args.watch:
+        try:
+            watch(args, module_names)
+        except KeyboardInterrupt:
+            return 0
+    return 0 if ok and not over_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Контракты ответов API и их проверка
+
+Схема описывается литералом: тип (int, str, bool, float), словарь полей,
+список из одной схемы элемента, а также Optional, Nullable, Enum, Pattern и
+AnyOf. Все контракты компилируются при импорте в цепочки замыканий, поэтому
+проверка ответа - это несколько сравнений типов без разбора схемы на лету
+и её можно выполнять для каждого ответа и в нагрузочных прогонах.
+
+    assert_schema(response)              # контракт по методу и эндпоинту
+    stream_list(url, validate=USER)      # проверка каждой записи списка
+
+Формы ответов описаны по заглушке stub_server: для реального бэкенда это
+допущение, при расхождении правится контракт, а не тест.
+"""
+import re
+from functools import lru_cache
+
+from metrics import endpoint_template
+
+
+class Optional:
+    """Необязательное поле объекта: если есть, проверяется схемой"""
+
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class Nullable:
+    """Значение по схеме или null"""
+
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class Enum:
+    """Одно из перечисленных значений"""
+
+    def __init__(self, *values):
+        self.values = frozenset(values)
+
+
+class Pattern:
+    """Строка, соответствующая регулярному выражению"""
+
+    def __init__(self, regex):
+        self.regex = re.compile(regex)
+
+
+class AnyOf:
+    """Значение, подходящее хотя бы под одну из схем"""
+
+    def __init__(self, *schemas):
+        self.schemas = schemas
+
+
+_TYPE_NAMES = {int: "целое", float: "число", str: "строка", bool: "логическое"}
+
+
+def _compile(schema):
+    """Замыкание value -> None или текст ошибки"""
+    if schema is int:
+        # bool - подкласс int, поэтому сравнение типа строгое
+        return lambda value: None if type(value) is int else f"ожидалось целое, получено {value!r}"
+    if schema is float:
+        return lambda value: (None if type(value) in (int, float)
+                              else f"ожидалось число, получено {value!r}")
+    if schema in (str, bool):
+        expected, name = schema, _TYPE_NAMES[schema]
+        return lambda value: None if type(value) is expected else f"ожидалось {name}, получено {value!r}"
+    if isinstance(schema, dict):
+        return _compile_object(schema)
+    if isinstance(schema, list):
+        return _compile_array(schema[0])
+    if isinstance(schema, Nullable):
+        inner = _compile(schema.schema)
+        return lambda value: None if value is None else inner(value)
+    if isinstance(schema, Enum):
+        values = schema.values
+        return lambda value: None if value in values else f"недопустимое значение {value!r}"
+    if isinstance(schema, Pattern):
+        match = schema.regex.match
+        return lambda value: (None if type(value) is str and match(value)
+                              else f"не соответствует шаблону: {value!r}")
+    if isinstance(schema, AnyOf):
+        return _compile_any_of([_compile(option) for option in schema.schemas])
+    raise TypeError(f"Неизвестный элемент схемы: {schema!r}")
+
+
+def _compile_object(schema):
+    required = []
+    optional = []
+    for key, field in schema.items():
+        if isinstance(field, Optional):
+            optional.append((key, _compile(field.schema)))
+        else:
+            required.append((key, _compile(field)))
+    required = tuple(required)
+    optional = tuple(optional)
+
+    def check(value):
+        if type(value) is not dict:
+            return f"ожидался объект, получено {value!r}"
+        for key, field in required:
+            if key not in value:
+                return f"нет поля {key}"
+            error = field(value[key])
+            if error:
+                return f"{key}: {error}"
+        for key, field in optional:
+            if key in value:
+                error = field(value[key])
+                if error:
+                    return f"{key}: {error}"
+        return None
+    return check
+
+
+def _compile_array(item_schema):
+    item = _compile(item_schema)
+
+    def check(value):
+        if type(value) is not list:
+            return f"ожидался массив, получено {value!r}"
+        for index, element in enumerate(value):
+            error = item(element)
+            if error:
+                return f"[{index}]: {error}"
+        return None
+    return check
+
+
+def _compile_any_of(options):
+    def check(value):
+        errors = []
+        for option in options:
+            error = option(value)
+            if error is None:
+                return None
+            errors.append(error)
+        return " | ".join(errors)
+    return check
+
+
+def validator(schema):
+    """Проверка по схеме, бросающая AssertionError; подходит для validate в stream_list"""
+    check = _compile(schema)
+
+    def validate(value):
+        error = check(value)
+        if error:
+            raise AssertionError(f"Ответ не соответствует контракту: {error}")
+    validate.check = check
+    return validate
+
+
+ROLES = Enum("USER", "ADMIN", "SUPER_ADMIN")
+JWT = Pattern(r"^[\w-]+\.[\w-]+\.[\w-]*$")
+TIMESTAMP = Pattern(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+MESSAGE_SCHEMA = {"message": str}
+TOKENS_SCHEMA = {"accessToken": JWT, "refreshToken": JWT}
+USER_SCHEMA = {
+    "id": int,
+    "username": str,
+    "email": str,
+    "role": Optional(ROLES),
+    "isBanned": Optional(bool),
+    "isActivated": Optional(bool),
+    "createdAt": Optional(Nullable(TIMESTAMP)),
+}
+WARNING_SCHEMA = {"id": int, "reason": str, "createdAt": Optional(TIMESTAMP)}
+SESSION_SCHEMA = {"id": int, "createdAt": Optional(TIMESTAMP), "current": Optional(bool)}
+# Список целиком или страница в стиле Spring
+USER_LIST_SCHEMA = AnyOf([USER_SCHEMA], {"content": [USER_SCHEMA], "last": Optional(bool)})
+
+USER = validator(USER_SCHEMA)
+
+# Контракты успешных ответов по методу и шаблону эндпоинта. Вход через Google
+# не проверяется: реальный бэкенд отвечает перенаправлением на сторонний сайт
+CONTRACTS = {
+    ("POST", "/auth/login"): validator(TOKENS_SCHEMA),
+    ("POST", "/auth/refresh_token"): validator(TOKENS_SCHEMA),
+    ("GET", "/auth/logout"): validator(MESSAGE_SCHEMA),
+    ("POST", "/auth/registration"): validator(MESSAGE_SCHEMA),
+    ("POST", "/recovery/reset-password"): validator(MESSAGE_SCHEMA),
+    ("POST", "/recovery/resend-activation"): validator(MESSAGE_SCHEMA),
+    ("GET", "/admin/list/users"): validator(USER_LIST_SCHEMA),
+    ("GET", "/admin/list/admins"): validator(USER_LIST_SCHEMA),
+    ("GET", "/admin/info/user/{id}"): USER,
+    ("GET", "/admin/info/user/{id}/warnings"): validator([WARNING_SCHEMA]),
+    ("GET", "/admin/info/admin"): USER,
+    ("POST", "/admin/create/admin"): USER,
+    ("DELETE", "/admin/delete/admin"): validator(MESSAGE_SCHEMA),
+    ("DELETE", "/admin/delete/user"): validator(MESSAGE_SCHEMA),
+    ("POST", "/admin/create/warning"): validator(WARNING_SCHEMA),
+    ("GET", "/user/info/profile"): USER,
+    ("GET", "/user/info/role"): validator({"role": ROLES}),
+    ("GET", "/user/info/sessions"): validator([SESSION_SCHEMA]),
+    ("DELETE", "/user/info/sessions/revoke/all"): validator(MESSAGE_SCHEMA),
+}
+
+
+@lru_cache(maxsize=1024)
+def contract_for(method, url):
+    """Контракт эндпоинта или None; шаблон URL вычисляется один раз на адрес"""
+    return CONTRACTS.get((method.upper(), endpoint_template(url)))
+
+
+def assert_schema(response):
+    """Проверка тела ответа по контракту его эндпоинта"""
+    request = response.request
+    validate = contract_for(request.method, request.url)
+    if validate is None:
+        raise AssertionError(f"Нет контракта для {request.method} {endpoint_template(request.url)}")
+    validate(response.json())
@@ -0,0 +1,298 @@
+"""Пакетное создание и удаление тестовых данных
+
+DataSeeder создаёт пользователей, администраторов и предупреждения
+параллельными запросами и записывает идентификаторы в манифест процесса.
+При завершении прогона всё созданное удаляется одним параллельным проходом.
+Манифесты процессов, завершившихся аварийно, подчищаются при следующем
+запуске, поэтому объём данных в списках не растёт от прогона к прогону.
+"""
+import atexit
+import glob
+import json
+import os
+import random
+import threading
+
+import config
+from api_client import client
+from fixtures import admin_token, auth_headers, session_fixture
+from streaming import stream_list
+
+JSON_HEADERS = {"accept": "application/json", "Content-Type": "application/json"}
+TEST_PASSWORD = "Test123!"
+# Сообщение 404 об отсутствующей записи; 404 с другим текстом (нет эндпоинта,
+# неверный префикс API) удалением не считается
+RECORD_NOT_FOUND = "Пользователь не найден"
+
+
+def _already_deleted(response):
+    """404 означает, что запись уже удалена, а не что нет самого эндпоинта"""
+    if response.status_code != 404:
+        return False
+    try:
+        return response.json().get("message") == RECORD_NOT_FOUND
+    except (ValueError, AttributeError):
+        return False
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class DataSeeder:
+    """Создание тестовых записей и их удаление по манифесту"""
+
+    def __init__(self, base_url=config.BASE_URL, http=client,
+                 workers=config.SEED_WORKERS, manifest_dir=config.SEED_MANIFEST_DIR):
+        self.base_url = base_url
+        self.http = http
+        self.workers = workers
+        self.manifest_path = os.path.join(manifest_dir, f"manifest-{os.getpid()}.json")
+        self.created = {"users": [], "admins": [], "usernames": []}
+        self._lock = threading.Lock()
+        rng = random.Random(config.SEED) if config.SEED is not None else random.Random()
+        self.tag = f"seed{rng.randrange(16 ** 6):06x}"
+        self._counter = 0
+        os.makedirs(manifest_dir, exist_ok=True)
+
+    def _headers(self):
+        return auth_headers(admin_token())
+
+    def _map(self, func, items):
+        """Параллельный map на потоках
+
+        ThreadPoolExecutor не принимает задачи в обработчиках atexit,
+        а удаление данных выполняется именно там.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        errors = []
+        positions = iter(range(len(items)))
+        lock = threading.Lock()
+
+        def work():
+            while True:
+                with lock:
+                    position = next(positions, None)
+                if position is None or errors:
+                    return
+                try:
+                    results[position] = func(items[position])
+                except Exception as error:
+                    errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(min(self.workers, len(items)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    def _names(self, count, kind):
+        with self._lock:
+            start = self._counter
+            self._counter += count
+        return [f"{self.tag}{kind}{n}" for n in range(start, start + count)]
+
+    def _remember(self, kind, values):
+        with self._lock:
+            self.created[kind].extend(values)
+            with open(self.manifest_path, "w", encoding="utf-8") as f:
+                json.dump({"baseUrl": self.base_url, "tag": self.tag, **self.created}, f)
+
+    def _find_ids(self, list_path, usernames, prefix=None):
+        """Словарь username -> id: один запрос по общему префиксу, по одному -
+        для тех, кого префиксный фильтр не вернул. Ненайденных в словаре нет
+
+        Список читается потоково со всеми страницами, в памяти остаются
+        только искомые записи.
+        """
+        wanted = set(usernames)
+
+        def fetch(username):
+            ids = {}
+
+            def collect(user):
+                if user["username"] in wanted:
+                    ids[user["username"]] = user["id"]
+
+            response, _ = stream_list(
+                f"{self.base_url}{list_path}", headers=self._headers(),
+                params={"username": username}, validate=collect, http=self.http,
+            )
+            response.raise_for_status()
+            return ids
+
+        found = fetch(prefix) if prefix else {}
+        missing = [name for name in usernames if name not in found]
+        for result in self._map(fetch, missing):
+            found.update(result)
+        return {name: found[name] for name in usernames if name in found}
+
+    def create_users(self, count):
+        """Регистрация count пользователей, возвращает их записи {id, username, email}"""
+        usernames = self._names(count, "u")
+
+        def register(username):
+            response = self.http.post(
+                f"{self.base_url}/auth/registration",
+                headers=JSON_HEADERS,
+                data=json.dumps({
+                    "username": username,
+                    "email": f"{username}@example.com",
+                    "password": TEST_PASSWORD,
+                }),
+            )
+            response.raise_for_status()
+
+        try:
+            self._map(register, usernames)
+        finally:
+            # Имена сохраняем сразу, чтобы удалить пользователей даже после сбоя
+            self._remember("usernames", usernames)
+        ids = self._find_ids("/admin/list/users", usernames, self.tag)
+        self._remember("users", list(ids.values()))
+        missing = [username for username in usernames if username not in ids]
+        if missing:
+            raise LookupError(f"Созданные пользователи не найдены в списке: {', '.join(missing)}")
+        return [
+            {"id": ids[username], "username": username, "email": f"{username}@example.com"}
+            for username in usernames
+        ]
+
+    def create_admins(self, count):
+        """Создание count администраторов, возвращает их записи"""
+        def create(username):
+            response = self.http.post(
+                f"{self.base_url}/admin/create/admin",
+                headers=self._headers(),
+                data=json.dumps({
+                    "username": username,
+                    "email": f"{username}@example.com",
+                    "password": TEST_PASSWORD,
+                }),
+            )
+            response.raise_for_status()
+            return response.json()
+
+        admins = self._map(create, self._names(count, "a"))
+        self._remember("admins", [admin["id"] for admin in admins])
+        return admins
+
+    def create_warnings(self, user_ids, reason="Тестовое предупреждение"):
+        """Предупреждение каждому пользователю из списка"""
+        def warn(user_id):
+            response = self.http.post(
+                f"{self.base_url}/admin/create/warning",
+                headers=self._headers(),
+                data=json.dumps({"userId": user_id, "reason": reason}),
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return self._map(warn, user_ids)
+
+    def track_user(self, username):
+        """Учёт пользователя, зарегистрированного самим тестом"""
+        self._remember("usernames", [username])
+
+    def teardown(self):
+        """Удаление всего созданного одним параллельным проходом"""
+        from requests import RequestException
+
+        with self._lock:
+            created = {kind: list(values) for kind, values in self.created.items()}
+        known = set(created["users"])
+        # Пользователи, id которых не успели получить, ищутся по имени
+        if created["usernames"]:
+            try:
+                known.update(self._find_ids("/admin/list/users", created["usernames"], self.tag).values())
+            except RequestException:
+                pass
+        if not self._delete(created["admins"], sorted(known)):
+            # Манифест остаётся, следующий запуск удалит записи через cleanup_stale
+            return
+        with self._lock:
+            self.created = {"users": [], "admins": [], "usernames": []}
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+    def _delete(self, admin_ids, user_ids):
+        from requests import RequestException
+
+        def delete(item):
+            path, item_id = item
+            try:
+                response = self.http.delete(
+                    f"{self.base_url}{path}", headers=self._headers(), params={"id": item_id},
+                )
+            except RequestException:
+                return False
+            return response.status_code in (200, 204) or _already_deleted(response)
+
+        items = [("/admin/delete/admin", item_id) for item_id in admin_ids]
+        items += [("/admin/delete/user", item_id) for item_id in user_ids]
+        return all(self._map(delete, items)) if items else True
+
+    def cleanup_stale(self):
+        """Удаление данных по манифестам завершившихся процессов
+
+        Сбой сервера не прерывает тест, вызвавший seeder(): манифест
+        остаётся до следующего запуска.
+        """
+        from requests import RequestException
+
+        for path in glob.glob(os.path.join(os.path.dirname(self.manifest_path), "manifest-*.json")):
+            pid = int(os.path.basename(path)[len("manifest-"):-len(".json")])
+            if pid == os.getpid() or _pid_alive(pid):
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                os.remove(path)
+                continue
+            if manifest.get("baseUrl") != self.base_url:
+                continue
+            user_ids = set(manifest.get("users", []))
+            if manifest.get("usernames"):
+                try:
+                    user_ids.update(self._find_ids(
+                        "/admin/list/users", manifest["usernames"], manifest.get("tag"),
+                    ).values())
+                except RequestException:
+                    continue
+            if self._delete(manifest.get("admins", []), sorted(user_ids)):
+                os.remove(path)
+
+
+@session_fixture
+def seeder():
+    """Общий DataSeeder прогона, данные удаляются при выходе"""
+    import multiprocessing
+    import multiprocessing.util
+
+    data_seeder = DataSeeder()
+    data_seeder.cleanup_stale()
+    if multiprocessing.parent_process() is None:
+        atexit.register(data_seeder.teardown)
+    else:
+        # Рабочие процессы пула завершаются без atexit
+        multiprocessing.util.Finalize(None, data_seeder.teardown, exitpriority=10)
+    return data_seeder
+
+
+@session_fixture
+def warned_user():
+    """Пользователь с одним предупреждением"""
+    user = seeder().create_users(1)[0]
+    seeder().create_warnings([user["id"]])
+    return user
@@ -0,0 +1,219 @@
+"""Выбор тестов по кэшу результатов прошлых прогонов
+
+Для каждого теста хранится ключ входных данных, исход и длительность
+последнего запуска. Ключ складывается из хеша исходного кода теста
+(метод, setUp/setUpClass класса и все модули проекта, достижимые из модуля
+теста через импорты, в том числе импорты внутри функций), действующих
+значений config и отпечатка сервера:
+
+- кассета - размер и время изменения файла кассеты;
+- config.FINGERPRINT_URL - хеш тела ответа, например документа OpenAPI;
+- заглушка - хеш исходного кода stub_server.py;
+- иначе только BASE_URL, изменения самого сервера при этом не видны.
+
+Прошедший тест с неизменным ключом можно пропустить (--changed), а
+остальные - выполнить начиная с упавших и самых долгих (--order failed-first).
+"""
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+
+import config
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+INDEX_VERSION = 1
+
+# Настройки, не влияющие на исход тестов: идентификатор прогона, пути отчётов
+# и индекса. BASE_URL и FINGERPRINT_URL уже учтены в отпечатке сервера, а
+# адрес заглушки меняется от прогона к прогону
+_IGNORED_SETTINGS = {
+    "RUN_ID", "BASE_URL", "FINGERPRINT_URL", "CONFIG_FILE", "PROFILE", "TOKEN_CACHE_FILE",
+    "METRICS_REPORT", "RESULT_SINKS", "RESULT_BODY_LIMIT", "RESULT_BATCH_SIZE",
+    "RESULT_FLUSH_INTERVAL", "SELECTION_INDEX", "SEED_MANIFEST_DIR",
+}
+
+# Порядок полей записи индекса: [ключ, исход, длительность, время запуска]
+_KEY, _OUTCOME, _DURATION, _RUN_AT = range(4)
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+_file_hashes = {}
+
+
+def _file_hash(path):
+    if path not in _file_hashes:
+        with open(path, "rb") as f:
+            _file_hashes[path] = _sha256(f.read())
+    return _file_hashes[path]
+
+
+def _project_file(obj):
+    """Файл модуля проекта, которому принадлежит объект, или None"""
+    module = obj if inspect.ismodule(obj) else sys.modules.get(getattr(obj, "__module__", None) or "")
+    path = getattr(module, "__file__", None)
+    if path and os.path.dirname(os.path.abspath(path)) == ROOT:
+        return os.path.abspath(path)
+    return None
+
+
+def _imported_files(path):
+    """Файлы проекта из всех import файла, включая импорты внутри функций"""
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    files = {os.path.join(ROOT, f"{name.split('.')[0]}.py") for name in names}
+    return {path for path in files if os.path.exists(path)}
+
+
+def _project_dependencies(path):
+    """Файлы проекта, от которых модуль зависит напрямую"""
+    files = _imported_files(path)
+    # Объекты, попавшие в пространство имён загруженного модуля иначе чем импортом
+    for module in list(sys.modules.values()):
+        if _project_file(module) == path:
+            files.update(_project_file(value) for value in vars(module).values())
+    files.discard(None)
+    return files
+
+
+_helper_hashes = {}
+
+
+def _helper_hash(module):
+    """Хеш модулей проекта, транзитивно достижимых из модуля теста"""
+    own_file = _project_file(module)
+    if own_file not in _helper_hashes:
+        seen, pending = set(), [own_file]
+        while pending:
+            for path in _project_dependencies(pending.pop()) - seen:
+                seen.add(path)
+                pending.append(path)
+        # Модуль самого теста не входит: в ключ попадает только исходник метода
+        seen.discard(own_file)
+        _helper_hashes[own_file] = _sha256("".join(_file_hash(path) for path in sorted(seen)).encode())
+    return _helper_hashes[own_file]
+
+
+_config_hash = None
+
+
+def _config_digest():
+    """Хеш действующих значений config, влияющих на исход тестов"""
+    global _config_hash
+    if _config_hash is None:
+        values = {
+            name: value for name, value in vars(config).items()
+            if name.isupper() and name not in _IGNORED_SETTINGS
+        }
+        _config_hash = _sha256(json.dumps(values, sort_keys=True, default=repr).encode())
+    return _config_hash
+
+
+def test_key(module_name, class_name, method, fingerprint):
+    """Ключ входных данных теста"""
+    module = importlib.import_module(module_name)
+    cls = getattr(module, class_name)
+    parts = [fingerprint, _config_digest(), _helper_hash(module), inspect.getsource(getattr(cls, method))]
+    for klass in cls.__mro__:
+        for name in ("setUpClass", "setUp", "asyncSetUp", "tearDown", "tearDownClass"):
+            if name in vars(klass) and _project_file(klass):
+                parts.append(inspect.getsource(getattr(klass, name)))
+    return _sha256("\0".join(parts).encode())[:16]
+
+
+def server_fingerprint():
+    """Отпечаток версии сервера, см. описание модуля"""
+    if config.CASSETTE and os.path.exists(config.CASSETTE):
+        stat = os.stat(config.CASSETTE)
+        return f"cassette:{stat.st_size}:{stat.st_mtime_ns}"
+    if config.FINGERPRINT_URL:
+        from api_client import client
+
+        url = config.FINGERPRINT_URL
+        if "://" not in url:
+            url = f"{config.BASE_URL}{url}"
+        response = client.get(url)
+        response.raise_for_status()
+        return f"url:{_sha256(response.content)}"
+    if config.BACKEND == "stub":
+        return f"stub:{_file_hash(os.path.join(ROOT, 'stub_server.py'))}"
+    return f"base:{config.BASE_URL}"
+
+
+class TestIndex:
+    """Компактный JSON-индекс: test_id -> [ключ, исход, длительность, время]"""
+
+    def __init__(self, path=config.SELECTION_INDEX):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("tests", {})
+
+    def is_fresh(self, test_id, key):
+        """Тест прошёл в прошлый раз с теми же входными данными"""
+        entry = self.entries.get(test_id)
+        return entry is not None and entry[_KEY] == key and entry[_OUTCOME] == "success"
+
+    def priority(self, test_id):
+        """Ключ сортировки: сначала упавшие и новые, затем самые долгие"""
+        entry = self.entries.get(test_id)
+        if entry is None:
+            return (0, 0.0)
+        return (0 if entry[_OUTCOME] in ("failure", "error") else 1, -entry[_DURATION])
+
+    def record(self, tests, keys):
+        now = int(time.time())
+        for test in tests:
+            key = keys.get(test["test"])
+            if key is not None:
+                self.entries[test["test"]] = [key, test["outcome"], round(test["duration"], 4), now]
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "tests": self.entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def select(units, index, keys, changed_only=False, order=False):
+    """Отбор и упорядочивание единиц плана (модуль, класс, методы)
+
+    Классы с @ordered при изменении хотя бы одного теста выполняются
+    целиком: их тесты зависят друг от друга. Возвращает единицы и
+    идентификаторы пропущенных тестов.
+    """
+    selected, skipped = [], []
+    for module_name, class_name, methods in units:
+        ids = {method: f"{module_name}.{class_name}.{method}" for method in methods}
+        stale = [method for method in methods if not index.is_fresh(ids[method], keys[ids[method]])]
+        if changed_only:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            if stale and getattr(cls, "ordered", False):
+                stale = list(methods)
+            skipped.extend(ids[method] for method in methods if method not in stale)
+            methods = stale
+        if methods:
+            selected.append((module_name, class_name, methods))
+    if order:
+        selected.sort(key=lambda unit: min(
+            index.priority(f"{unit[0]}.{unit[1]}.{method}") for method in unit[2]
+        ))
+    return selected, skipped
@@ -0,0 +1,271 @@
+"""Длительный прогон (soak) с поиском медленной деградации и утечек
+
+Позитивные сценарии аутентификации, информации о пользователе и списков
+администратора выполняются с постоянной частотой в течение --duration.
+Каждые --window секунд окно закрывается: фиксируются пропускная способность,
+перцентили задержки, ошибки, открытые сокеты и дескрипторы, RSS процесса и
+число сеансов администратора на сервере. По закрытым окнам после прогрева
+(--warmup: импорт, пул соединений, кэши) строится прямая тренда, и если
+рост за час превышает порог, выводится тревога - до того, как деградация
+приведёт к явным сбоям. С заглушкой (API_BACKEND=stub) сервер работает в
+том же процессе, и его сокеты и память входят в замеры.
+
+    python soak.py --duration 14400 --rps 20 --window 60
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from api_client import client
+from config import BASE_URL
+from fixtures import admin_token, auth_headers
+from load import Scenario, run_load
+from metrics import linear_trend, percentile
+
+# Сценарии без накопления состояния: логин и обновление токена закрывают
+# открытые ими сеансы, поэтому рост числа сеансов на сервере - настоящая утечка
+SOAK_SCENARIOS = {
+    "test_Auth.AuthAPITests.test_01_login_success": 1,
+    "test_Auth.AuthAPITests.test_02_refresh_token_success": 1,
+    "test_Auth.AuthAPITests.test_03_google_oauth_success": 1,
+    "test_Auth.AuthAPITests.test_04_logout_success": 1,
+    "test_user_info.UserInfoPositiveTests.test_get_user_profile_info_success": 3,
+    "test_user_info.UserInfoPositiveTests.test_get_user_role_success": 1,
+    "test_user_info.UserInfoPositiveTests.test_get_all_sessions_success": 1,
+    "test_admin_user.AdminUsersPositiveTests.test_get_all_users_info_success": 2,
+    "test_admin_user.AdminUsersPositiveTests.test_get_user_info_by_id_success": 2,
+    "test_super_admin.SuperAdminPositiveTests.test_get_all_admins_info_success": 1,
+}
+
+# Метрика окна -> (подпись, единица роста за час)
+TRENDS = {
+    "p95_ms": ("p95 задержки", "%/ч"),
+    "rss_mb": ("RSS", "МБ/ч"),
+    "sockets": ("открытые сокеты", "шт/ч"),
+    "sessions": ("сеансы на сервере", "шт/ч"),
+}
+
+
+def open_sockets():
+    """Число открытых сокетов и дескрипторов процесса, (None, None) без /proc"""
+    fd_dir = "/proc/self/fd"
+    try:
+        descriptors = os.listdir(fd_dir)
+    except OSError:
+        return None, None
+    sockets = 0
+    for fd in descriptors:
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith("socket:"):
+                sockets += 1
+        except OSError:
+            pass
+    return sockets, len(descriptors)
+
+
+def rss_mb():
+    """Текущий RSS процесса в МБ; без /proc - пиковый по getrusage"""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux отдаёт килобайты, macOS - байты
+        return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def server_sessions():
+    """Число сеансов администратора на сервере, None при ошибке"""
+    try:
+        response = client.get(f"{BASE_URL}/user/info/sessions", headers=auth_headers(admin_token()))
+    except Exception:
+        return None
+    return len(response.json()) if response.status_code == 200 else None
+
+
+class _Window:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.scenarios = 0
+        self.failed = 0
+
+
+class SoakStats:
+    """Сбор метрик по окнам; в памяти только текущее окно и итоги закрытых"""
+
+    def __init__(self):
+        self.windows = []
+        self._window = _Window()
+        self._lock = threading.Lock()
+
+    def on_request(self, method, url, response, elapsed):
+        failed = response is None or response.status_code >= 500
+        with self._lock:
+            self._window.latencies.append(elapsed)
+            self._window.errors += failed
+
+    def on_scenario(self, name, passed):
+        with self._lock:
+            self._window.scenarios += 1
+            self._window.failed += not passed
+
+    def close_window(self, elapsed, length):
+        """Итог текущего окна вместе со снимком ресурсов"""
+        with self._lock:
+            window, self._window = self._window, _Window()
+        values = sorted(window.latencies)
+        sockets, descriptors = open_sockets()
+        summary = {
+            "at": elapsed,
+            "rps": len(values) / length,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "errors": window.errors,
+            "failed": window.failed,
+            "scenarios": window.scenarios,
+            "sockets": sockets,
+            "descriptors": descriptors,
+            "rss_mb": rss_mb(),
+            "sessions": server_sessions(),
+        }
+        self.windows.append(summary)
+        return summary
+
+
+def growth_per_hour(windows, metric):
+    """Рост метрики за час по прямой тренда; для задержки - в % от начала"""
+    points = [(window["at"] / 3600, window[metric]) for window in windows
+              if window[metric] is not None and (metric != "p95_ms" or window["scenarios"])]
+    fit = linear_trend(points)
+    if fit is None:
+        return None
+    slope, intercept = fit
+    if metric == "p95_ms":
+        return slope / intercept * 100 if intercept > 0 else None
+    return slope
+
+
+class TrendAlarm:
+    """Тревога при превышении порога роста, повторно - только после возврата в норму"""
+
+    def __init__(self, thresholds, min_windows, warmup=0.0, stream=sys.stdout):
+        self.thresholds = thresholds
+        self.min_windows = min_windows
+        self.warmup = warmup
+        self.stream = stream
+        self.active = set()
+        self.raised = set()
+
+    def steady(self, windows):
+        """Окна после прогрева"""
+        return [window for window in windows if window["at"] > self.warmup]
+
+    def check(self, windows):
+        windows = self.steady(windows)
+        if len(windows) < self.min_windows:
+            return
+        for metric, threshold in self.thresholds.items():
+            growth = growth_per_hour(windows, metric)
+            label, unit = TRENDS[metric]
+            if growth is not None and growth > threshold:
+                if metric not in self.active:
+                    self.stream.write(
+                        f"ТРЕВОГА: {label} растёт на {growth:.1f} {unit} (порог {threshold:g} {unit})\n"
+                    )
+                    self.active.add(metric)
+                    self.raised.add(metric)
+            elif metric in self.active:
+                self.stream.write(f"Норма: рост «{label}» ниже порога\n")
+                self.active.discard(metric)
+
+
+def _format_window(window):
+    def value(metric, fmt):
+        return "-" if window[metric] is None else format(window[metric], fmt)
+    return (
+        f"[{time.strftime('%H:%M:%S', time.gmtime(window['at']))}]"
+        f" RPS {window['rps']:.1f}, p50 {window['p50_ms']:.1f} мс, p95 {window['p95_ms']:.1f} мс"
+        f", ошибок {window['errors']}, провалено сценариев {window['failed']}"
+        f", сокетов {value('sockets', 'd')}, RSS {value('rss_mb', '.1f')} МБ"
+        f", сеансов {value('sessions', 'd')}"
+    )
+
+
+def run_soak(scenarios, users, rps, duration, window, alarm, stream=sys.stdout):
+    """Нагрузка с закрытием окон в фоновом потоке, возвращает SoakStats"""
+    stats = SoakStats()
+    done = threading.Event()
+
+    def sample():
+        start = time.monotonic()
+        closed = start
+        while not done.wait(window - (time.monotonic() - closed)):
+            now = time.monotonic()
+            summary = stats.close_window(now - start, now - closed)
+            closed = now
+            stream.write(_format_window(summary) + "\n")
+            alarm.check(stats.windows)
+            stream.flush()
+
+    sampler = threading.Thread(target=sample, name="soak-sampler", daemon=True)
+    sampler.start()
+    try:
+        run_load(scenarios, users, rps, duration, stats=stats)
+    finally:
+        done.set()
+        sampler.join()
+    return stats
+
+
+def report(stats, alarm, stream=sys.stdout):
+    """Итоговые тренды по окнам после прогрева"""
+    steady = alarm.steady(stats.windows)
+    stream.write(
+        f"\nОкон: {len(stats.windows)}, после прогрева: {len(steady)}"
+        f"\n{'Метрика':<22}{'Рост':>14}{'Порог':>14}\n"
+    )
+    for metric, threshold in alarm.thresholds.items():
+        label, unit = TRENDS[metric]
+        growth = growth_per_hour(steady, metric)
+        shown = "-" if growth is None else f"{growth:.1f} {unit}"
+        stream.write(f"{label:<22}{shown:>14}{f'{threshold:g} {unit}':>14}\n")
+    errors = sum(window["errors"] for window in stats.windows)
+    failed = sum(window["failed"] for window in stats.windows)
+    stream.write(f"Ошибок запросов: {errors}, провалено сценариев: {failed}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-d", "--duration", type=float, default=3600, help="длительность, с")
+    parser.add_argument("-r", "--rps", type=float, default=20, help="постоянная частота запросов")
+    parser.add_argument("-u", "--users", type=int, default=4, help="виртуальных пользователей")
+    parser.add_argument("--window", type=float, default=60, help="длина окна, с")
+    parser.add_argument("--warmup", type=float, default=120, help="прогрев без оценки тренда, с")
+    parser.add_argument("--min-windows", type=int, default=5, help="окон до первой оценки тренда")
+    parser.add_argument("--latency-creep", type=float, default=20, help="порог роста p95, %%/ч")
+    parser.add_argument("--rss-growth", type=float, default=50, help="порог роста RSS, МБ/ч")
+    parser.add_argument("--socket-growth", type=float, default=10, help="порог роста сокетов, шт/ч")
+    parser.add_argument("--session-growth", type=float, default=20, help="порог роста сеансов, шт/ч")
+    args = parser.parse_args(argv)
+
+    thresholds = {
+        "p95_ms": args.latency_creep,
+        "rss_mb": args.rss_growth,
+        "sockets": args.socket_growth,
+        "sessions": args.session_growth,
+    }
+    scenarios = [Scenario(name, weight) for name, weight in SOAK_SCENARIOS.items()]
+    alarm = TrendAlarm(thresholds, args.min_windows, args.warmup)
+    stats = run_soak(scenarios, args.users, args.rps, args.duration, args.window, alarm)
+    report(stats, alarm)
+    return 1 if alarm.raised else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
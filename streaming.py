@@ -0,0 +1,152 @@
+"""Потоковое чтение списков без загрузки всего ответа в память
+
+Массив JSON разбирается по элементам по мере прихода данных, каждый
+элемент проверяется и отбрасывается, в памяти остаются только счётчики и
+несколько первых записей для вывода. Если сервер отдаёт страницу в стиле
+Spring ({"content": [...], "last": false, "number": 0, "size": 20}),
+следующие страницы запрашиваются автоматически.
+"""
+import codecs
+import json
+
+from api_client import client
+
+CHUNK_SIZE = 64 * 1024
+SAMPLE_SIZE = 3
+
+_WHITESPACE = " \t\r\n"
+_TERMINATORS = ",]" + _WHITESPACE
+
+
+class ListSummary:
+    """Итог чтения списка: число записей, объём и несколько первых записей"""
+
+    def __init__(self):
+        self.count = 0
+        self.pages = 0
+        self.bytes_read = 0
+        self.sample = []
+
+    def add(self, record):
+        self.count += 1
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(record)
+
+
+class _JsonStream:
+    """Текст ответа порциями с инкрементальным декодированием UTF-8"""
+
+    def __init__(self, response, summary, chunk_size=CHUNK_SIZE):
+        self._chunks = response.iter_content(chunk_size)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._summary = summary
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """Дочитывание следующей порции, False в конце ответа"""
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer = self.buffer[self.pos:] + self._decoder.decode(b"", final=True)
+        else:
+            self._summary.bytes_read += len(chunk)
+            self.buffer = self.buffer[self.pos:] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Первый непробельный символ без продвижения, None в конце"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return None
+
+    def rest(self):
+        """Весь оставшийся текст, для небольших ответов-страниц"""
+        while self.more():
+            pass
+        return self.buffer[self.pos:]
+
+
+def iter_json_array(stream):
+    """Элементы массива JSON по одному"""
+    decoder = json.JSONDecoder()
+    if stream.peek() != "[":
+        raise ValueError("Ответ не является массивом JSON")
+    stream.pos += 1
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        stream.peek()
+        try:
+            item, end = decoder.raw_decode(stream.buffer, stream.pos)
+        except json.JSONDecodeError:
+            # Элемент ещё не пришёл целиком
+            if not stream.more():
+                raise
+            continue
+        complete = end < len(stream.buffer) and stream.buffer[end] in _TERMINATORS
+        if not complete and not stream.eof:
+            # Число на границе порции могло быть обрезано
+            stream.more()
+            continue
+        stream.pos = end
+        yield item
+        separator = stream.peek()
+        stream.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Некорректный разделитель массива: {separator!r}")
+
+
+def stream_list(url, headers=None, params=None, validate=None, http=client):
+    """Потоковое чтение списка со всеми страницами
+
+    Возвращает первый ответ и ListSummary. При коде, отличном от 200,
+    тело не разбирается: для первой страницы summary равен None, для
+    следующих возвращается ответ с ошибкой и summary прочитанных страниц. Каждый ответ закрывается
+    после чтения тела, поэтому подписчики клиента получают полное время
+    запроса, а не время до заголовков.
+    """
+    params = dict(params or {})
+    summary = ListSummary()
+    first_response = None
+    while True:
+        response = http.get(url, headers=headers, params=params, stream=True)
+        if first_response is None:
+            first_response = response
+        if response.status_code != 200:
+            # Тело ошибки небольшое, читаем целиком для вывода
+            response.content
+            response.close()
+            return response, (summary if summary.pages else None)
+
+        with response:
+            stream = _JsonStream(response, summary)
+            summary.pages += 1
+            if stream.peek() == "{":
+                page = json.loads(stream.rest())
+                records = page.get("content", [])
+            else:
+                page = None
+                records = iter_json_array(stream)
+            for record in records:
+                if validate:
+                    validate(record)
+                summary.add(record)
+            # Хвост после массива, чтобы замер закончился на конце тела
+            stream.rest()
+
+        if page is None or page.get("last", True):
+            return first_response, summary
+        params["page"] = page.get("number", params.get("page", 0)) + 1
+        params.setdefault("size", page.get("size"))
@@ -0,0 +1,260 @@
+"""Стресс-режим сеансов: конкурентные refresh, logout и revoke-all
+
+Множество потоков одновременно выполняют логин, обновление токена,
+выход и завершение всех сеансов одной учётной записи, в том числе
+повторно предъявляя уже использованные refresh token. После нагрузки
+проверяются инварианты:
+
+- ни один refresh token не принят дважды;
+- токены завершённых сеансов отвергаются;
+- число сеансов на сервере сходится с числом живых токенов, а после
+  финального revoke-all остаётся ровно один сеанс.
+
+Режим завершает все сеансы учётной записи, включая общий кэш токенов,
+поэтому запускать его параллельно с тестами нельзя.
+
+    python stress_sessions.py --threads 32 --ops 1000
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+
+from requests import RequestException
+
+import config
+from api_client import ApiClient
+from fixtures import auth_headers, invalidate_admin_token
+from metrics import percentile
+
+OPERATIONS = {"refresh": 6, "login": 2, "logout": 2, "revoke_all": 1}
+REJECTED = (400, 401, 403, 404)
+
+
+class TrackedSession:
+    """Сеанс глазами клиента: последние токены и признак завершения"""
+
+    def __init__(self, tokens, opened_seq):
+        self.access_token = tokens["accessToken"]
+        self.refresh_token = tokens["refreshToken"]
+        self.opened_seq = opened_seq
+        self.closed = False
+        # Все access token сеанса: после завершения каждый должен отвергаться
+        self.access_history = [self.access_token]
+
+
+class SessionStress:
+    """Генератор конкурентных операций и проверка инвариантов"""
+
+    def __init__(self, login, password, threads, replay_probability, seed=None):
+        self.login = login
+        self.password = password
+        self.http = ApiClient(pool_maxsize=threads, retries=0)
+        self.replay_probability = replay_probability
+        self.rng = random.Random(seed)
+        self.sessions = []
+        self.accepted_refresh = {}
+        self.stats = {name: {"latencies": [], "ok": 0, "rejected": 0, "errors": 0}
+                      for name in (*OPERATIONS, "replay")}
+        self.violations = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _call(self, operation, method, path, token=None, data=None):
+        headers = {"accept": "application/json", "Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        start = time.perf_counter()
+        try:
+            response = self.http.request(
+                method, f"{config.BASE_URL}{path}", headers=headers,
+                data=json.dumps(data) if data is not None else None,
+            )
+        except RequestException:
+            response = None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self.stats[operation]
+            stats["latencies"].append(elapsed)
+            if response is not None and response.status_code == 200:
+                stats["ok"] += 1
+            elif response is not None and response.status_code in REJECTED:
+                stats["rejected"] += 1
+            else:
+                stats["errors"] += 1
+        return response
+
+    def _pick(self, rng):
+        with self._lock:
+            alive = [session for session in self.sessions if not session.closed]
+        return rng.choice(alive) if alive else None
+
+    def op_login(self, rng):
+        response = self._call("login", "POST", "/auth/login",
+                              data={"login": self.login, "password": self.password})
+        if response is not None and response.status_code == 200:
+            with self._lock:
+                self.sessions.append(TrackedSession(response.json(), next(self._seq)))
+
+    def op_refresh(self, rng):
+        session = self._pick(rng)
+        if session is None:
+            return self.op_login(rng)
+        token = session.refresh_token
+        response = self._call("refresh", "POST", "/auth/refresh_token", token=token)
+        if response is None or response.status_code != 200:
+            return
+        body = response.json()
+        with self._lock:
+            self.accepted_refresh[token] = self.accepted_refresh.get(token, 0) + 1
+            if self.accepted_refresh[token] > 1:
+                self.violations.append(f"refresh token принят повторно: ...{token[-12:]}")
+            session.access_token = body["accessToken"]
+            session.access_history.append(body["accessToken"])
+            session.refresh_token = body.get("refreshToken", token)
+        if rng.random() < self.replay_probability:
+            self._replay(token)
+
+    def _replay(self, token):
+        """Повторное предъявление уже принятого refresh token"""
+        response = self._call("replay", "POST", "/auth/refresh_token", token=token)
+        if response is not None and response.status_code == 200:
+            with self._lock:
+                self.violations.append(f"использованный refresh token принят снова: ...{token[-12:]}")
+
+    def op_logout(self, rng):
+        session = self._pick(rng)
+        if session is None:
+            return self.op_login(rng)
+        response = self._call("logout", "GET", "/auth/logout", token=session.access_token)
+        if response is not None and response.status_code == 200:
+            with self._lock:
+                session.closed = True
+
+    def op_revoke_all(self, rng):
+        session = self._pick(rng)
+        if session is None:
+            return self.op_login(rng)
+        started = next(self._seq)
+        response = self._call("revoke_all", "DELETE", "/user/info/sessions/revoke/all",
+                              token=session.access_token)
+        if response is None or response.status_code != 200:
+            return
+        with self._lock:
+            # Сеансы, открытые до запроса, гарантированно завершены
+            for other in self.sessions:
+                if other is not session and other.opened_seq < started:
+                    other.closed = True
+
+    def _worker(self, operations, seed):
+        rng = random.Random(seed)
+        for operation in operations:
+            getattr(self, f"op_{operation}")(rng)
+
+    def run(self, threads, total_ops, initial_sessions):
+        """Нагрузка и проверка инвариантов, возвращает длительность фазы нагрузки"""
+        for _ in range(initial_sessions):
+            self.op_login(self.rng)
+
+        names = list(OPERATIONS)
+        plan = self.rng.choices(names, [OPERATIONS[name] for name in names], k=total_ops)
+        workers = [
+            threading.Thread(target=self._worker, args=(plan[index::threads], self.rng.random()))
+            for index in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        duration = time.perf_counter() - start
+
+        self.check_invariants()
+        return duration
+
+    def _accepted(self, access_token):
+        response = self.http.get(f"{config.BASE_URL}/user/info/profile", headers=auth_headers(access_token))
+        return response.status_code == 200
+
+    def _session_count(self, access_token):
+        response = self.http.get(f"{config.BASE_URL}/user/info/sessions", headers=auth_headers(access_token))
+        response.raise_for_status()
+        return len(response.json())
+
+    def check_invariants(self):
+        for session in self.sessions:
+            if session.closed:
+                for token in session.access_history:
+                    if self._accepted(token):
+                        self.violations.append(f"токен завершённого сеанса принят: ...{token[-12:]}")
+
+        checker = self.http.post(
+            f"{config.BASE_URL}/auth/login",
+            headers={"Content-Type": "application/json"},
+            data=json.dumps({"login": self.login, "password": self.password}),
+        ).json()["accessToken"]
+        alive = sum(1 for session in self.sessions
+                    if not session.closed and self._accepted(session.access_token))
+        listed = self._session_count(checker)
+        if listed < alive + 1:
+            self.violations.append(f"сеансов в списке {listed}, живых токенов {alive + 1}")
+
+        self.http.delete(f"{config.BASE_URL}/user/info/sessions/revoke/all", headers=auth_headers(checker))
+        remaining = self._session_count(checker)
+        if remaining != 1:
+            self.violations.append(f"после revoke-all осталось сеансов: {remaining}")
+        for session in self.sessions:
+            if not session.closed and self._accepted(session.access_token):
+                self.violations.append(
+                    f"токен принят после финального revoke-all: ...{session.access_token[-12:]}"
+                )
+        self.http.get(f"{config.BASE_URL}/auth/logout", headers=auth_headers(checker))
+
+    def report(self, duration, stream=sys.stdout):
+        total = sum(len(stats["latencies"]) for stats in self.stats.values())
+        stream.write(
+            f"\nДлительность: {duration:.2f} с, операций: {total}"
+            f", пропускная способность: {total / duration:.1f} оп/с\n"
+        )
+        stream.write(f"\n{'Операция':<12}{'Всего':>8}{'200':>8}{'Отказ':>8}{'Ошибки':>8}"
+                     f"{'% ошибок':>10}{'p50, мс':>9}{'p95, мс':>9}\n")
+        for name, stats in self.stats.items():
+            values = sorted(stats["latencies"])
+            if not values:
+                continue
+            stream.write(
+                f"{name:<12}{len(values):>8}{stats['ok']:>8}{stats['rejected']:>8}"
+                f"{stats['errors']:>8}{stats['errors'] / len(values):>10.1%}"
+                f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 95) * 1000:>9.1f}\n"
+            )
+        stream.write(f"\nНарушений инвариантов: {len(self.violations)}\n")
+        for violation in self.violations[:20]:
+            stream.write(f"  {violation}\n")
+        return not self.violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-t", "--threads", type=int, default=32)
+    parser.add_argument("-n", "--ops", type=int, default=500, help="всего операций")
+    parser.add_argument("--sessions", type=int, default=10, help="сеансов перед стартом")
+    parser.add_argument("--replay", type=float, default=0.2,
+                        help="доля обновлений с повторным предъявлением старого refresh token")
+    parser.add_argument("--login", default=config.ADMIN_LOGIN)
+    parser.add_argument("--password", default=config.ADMIN_PASSWORD)
+    args = parser.parse_args(argv)
+
+    stress = SessionStress(args.login, args.password, args.threads, args.replay, config.SEED)
+    try:
+        duration = stress.run(args.threads, args.ops, args.sessions)
+    finally:
+        if args.login == config.ADMIN_LOGIN:
+            invalidate_admin_token()
+    return 0 if stress.report(duration) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,464 @@
+"""Заглушка бэкенда /api/v1 с состоянием в памяти
+
+Реализует эндпоинты, которые проверяют наборы тестов: авторизацию,
+восстановление, модерацию, информацию о пользователе и управление
+администраторами. Запускается внутри процесса тестов (API_BACKEND=stub)
+или отдельно:
+
+    python stub_server.py --port 8080
+"""
+import argparse
+import base64
+import itertools
+import json
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/api/v1"
+ACCESS_TTL = 900
+REFRESH_TTL = 86400
+
+ADMIN_ROLES = ("ADMIN", "SUPER_ADMIN")
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+class HttpError(Exception):
+    """Ответ с кодом ошибки из обработчика"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class StubState:
+    """Пользователи, предупреждения и сеансы заглушки"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users = {}
+        self.sessions = {}
+        self.access_tokens = {}
+        self.refresh_tokens = {}
+        self._ids = itertools.count(1)
+        self._session_ids = itertools.count(1)
+        self._warning_ids = itertools.count(1)
+
+        self.add_user("admin", "admin@example.com", "Admin123!", role="SUPER_ADMIN", activated=True)
+        self.add_user("TestUser", "TestUser@example.com", "Test123!", activated=True)
+
+    @staticmethod
+    def _now():
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+
+    def add_user(self, username, email, password, role="USER", activated=False):
+        with self.lock:
+            user_id = next(self._ids)
+            self.users[user_id] = {
+                "id": user_id,
+                "username": username,
+                "email": email,
+                "password": password,
+                "role": role,
+                "isBanned": False,
+                "isActivated": activated,
+                "createdAt": self._now(),
+                "warnings": [],
+            }
+            return self.users[user_id]
+
+    def add_warning(self, user, reason):
+        warning = {"id": next(self._warning_ids), "reason": reason, "createdAt": self._now()}
+        user["warnings"].append(warning)
+        return warning
+
+    def find_user(self, login):
+        for user in self.users.values():
+            if login in (user["username"], user["email"]):
+                return user
+        return None
+
+    def check_unique(self, username, email):
+        if any(user["username"] == username for user in self.users.values()):
+            raise HttpError(409, "Пользователь с таким username уже существует")
+        if any(user["email"] == email for user in self.users.values()):
+            raise HttpError(409, "Пользователь с таким email уже существует")
+
+    def issue_tokens(self, session_id):
+        """Новая пара токенов сеанса, прежний refresh token перестаёт действовать"""
+        session = self.sessions[session_id]
+        self.access_tokens.pop(session.get("accessToken"), None)
+        self.refresh_tokens.pop(session.get("refreshToken"), None)
+        now = int(time.time())
+        tokens = {}
+        for kind, ttl in (("access", ACCESS_TTL), ("refresh", REFRESH_TTL)):
+            payload = {"sub": str(session["userId"]), "sid": session_id, "typ": kind,
+                       "iat": now, "exp": now + ttl, "jti": secrets.token_hex(8)}
+            tokens[kind] = f"{_b64({'alg': 'none'})}.{_b64(payload)}.{secrets.token_hex(8)}"
+        session["accessToken"] = tokens["access"]
+        session["refreshToken"] = tokens["refresh"]
+        self.access_tokens[tokens["access"]] = session_id
+        self.refresh_tokens[tokens["refresh"]] = session_id
+        return {"accessToken": tokens["access"], "refreshToken": tokens["refresh"]}
+
+    def open_session(self, user_id):
+        session_id = next(self._session_ids)
+        self.sessions[session_id] = {"id": session_id, "userId": user_id, "createdAt": self._now()}
+        return self.issue_tokens(session_id)
+
+    def close_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session:
+            self.access_tokens.pop(session["accessToken"], None)
+            self.refresh_tokens.pop(session["refreshToken"], None)
+
+
+def public_user(user):
+    """Пользователь без пароля и списка предупреждений"""
+    return {key: value for key, value in user.items() if key not in ("password", "warnings")}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Маршрутизация запросов заглушки"""
+
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело уходят отдельными записями, без этого Nagle даёт +40 мс
+    disable_nagle_algorithm = True
+    routes = []
+
+    @classmethod
+    def route(cls, method, pattern):
+        def register(handler):
+            cls.routes.append((method, re.compile(f"^{pattern}$"), handler))
+            return handler
+        return register
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            self.body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            self._send(400, {"message": "Некорректный JSON"})
+            return
+
+        path = parts.path[len(API_PREFIX):] if parts.path.startswith(API_PREFIX) else None
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path or "")
+            if match and route_method == method:
+                try:
+                    with self.state.lock:
+                        status, payload = handler(self, *match.groups())
+                except HttpError as error:
+                    status, payload = error.status, {"message": error.message}
+                self._send(status, payload)
+                return
+        self._send(404, {"message": "Эндпоинт не найден"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def bearer(self):
+        header = self.headers.get("Authorization", "")
+        return header[len("Bearer "):] if header.startswith("Bearer ") else None
+
+    def current_session(self, roles=None):
+        """Сеанс по access token, с проверкой роли пользователя"""
+        session_id = self.state.access_tokens.get(self.bearer())
+        if session_id is None:
+            raise HttpError(401, "Требуется авторизация")
+        session = self.state.sessions[session_id]
+        if roles and self.state.users[session["userId"]]["role"] not in roles:
+            raise HttpError(403, "Недостаточно прав")
+        return session
+
+    def current_user(self, roles=None):
+        return self.state.users[self.current_session(roles)["userId"]]
+
+    def required(self, *fields):
+        values = [str(self.body.get(field) or "").strip() for field in fields]
+        if not all(values):
+            raise HttpError(400, f"Обязательные поля: {', '.join(fields)}")
+        return values
+
+
+route = StubHandler.route
+
+
+@route("POST", r"/auth/login")
+def login(handler):
+    user = handler.state.find_user(handler.body.get("login"))
+    if user is None or user["password"] != handler.body.get("password"):
+        raise HttpError(404, "Неверный логин или пароль")
+    return 200, handler.state.open_session(user["id"])
+
+
+@route("POST", r"/auth/refresh_token")
+def refresh_token(handler):
+    session_id = handler.state.refresh_tokens.get(handler.bearer())
+    if session_id is None:
+        raise HttpError(401, "Недействительный refresh token")
+    return 200, handler.state.issue_tokens(session_id)
+
+
+@route("GET", r"/auth/login/oauth2/google")
+def google_oauth(handler):
+    return 200, {"url": "https://accounts.google.com/o/oauth2/v2/auth?client_id=stub"}
+
+
+@route("GET", r"/auth/logout")
+def logout(handler):
+    handler.state.close_session(handler.current_session()["id"])
+    return 200, {"message": "Выход выполнен"}
+
+
+@route("POST", r"/auth/registration")
+def registration(handler):
+    username, email, password = handler.required("username", "email", "password")
+    handler.state.check_unique(username, email)
+    handler.state.add_user(username, email, password)
+    return 200, {"message": "Письмо для активации отправлено"}
+
+
+@route("POST", r"/recovery/reset-password")
+def reset_password(handler):
+    email, = handler.required("email")
+    if handler.state.find_user(email) is None:
+        raise HttpError(404, "Пользователь не найден")
+    return 200, {"message": "Письмо для сброса пароля отправлено"}
+
+
+@route("POST", r"/recovery/resend-activation")
+def resend_activation(handler):
+    email, = handler.required("email")
+    user = handler.state.find_user(email)
+    if user is None:
+        raise HttpError(404, "Пользователь не найден")
+    if user["isActivated"]:
+        raise HttpError(400, "Аккаунт уже активирован")
+    return 200, {"message": "Письмо для активации отправлено"}
+
+
+def _filter_users(handler, roles):
+    username = handler.query.get("username", "").lower()
+    email = handler.query.get("email", "").lower()
+    banned = handler.query.get("isBanned")
+    result = []
+    for user in handler.state.users.values():
+        if user["role"] not in roles:
+            continue
+        if username and username not in user["username"].lower():
+            continue
+        if email and email not in user["email"].lower():
+            continue
+        if banned is not None and str(user["isBanned"]).lower() != banned.lower():
+            continue
+        result.append(public_user(user))
+    return result
+
+
+def _paged(handler, items):
+    """Массив целиком или страница в стиле Spring, если передан page"""
+    if "page" not in handler.query:
+        return items
+    try:
+        page = int(handler.query["page"])
+        size = int(handler.query.get("size", 20))
+    except ValueError:
+        raise HttpError(400, "Параметры page и size должны быть числами")
+    start = page * size
+    return {
+        "content": items[start:start + size],
+        "number": page,
+        "size": size,
+        "totalElements": len(items),
+        "last": start + size >= len(items),
+    }
+
+
+@route("GET", r"/admin/list/users")
+def list_users(handler):
+    handler.current_session(ADMIN_ROLES)
+    return 200, _paged(handler, _filter_users(handler, ("USER",)))
+
+
+@route("GET", r"/admin/list/admins")
+def list_admins(handler):
+    handler.current_session(("SUPER_ADMIN",))
+    return 200, _paged(handler, _filter_users(handler, ADMIN_ROLES))
+
+
+def _user_or_404(handler, user_id, roles=("USER", "ADMIN", "SUPER_ADMIN")):
+    user = handler.state.users.get(int(user_id))
+    if user is None or user["role"] not in roles:
+        raise HttpError(404, "Пользователь не найден")
+    return user
+
+
+@route("GET", r"/admin/info/user/(\d+)")
+def user_info(handler, user_id):
+    handler.current_session(ADMIN_ROLES)
+    return 200, public_user(_user_or_404(handler, user_id))
+
+
+@route("GET", r"/admin/info/user/(\d+)/warnings")
+def user_warnings(handler, user_id):
+    handler.current_session(ADMIN_ROLES)
+    return 200, _user_or_404(handler, user_id)["warnings"]
+
+
+def _query_id(handler):
+    try:
+        return int(handler.query.get("id", ""))
+    except ValueError:
+        raise HttpError(400, "Параметр id должен быть числом")
+
+
+@route("GET", r"/admin/info/admin")
+def admin_info(handler):
+    handler.current_session(("SUPER_ADMIN",))
+    return 200, public_user(_user_or_404(handler, _query_id(handler), ADMIN_ROLES))
+
+
+@route("POST", r"/admin/create/admin")
+def create_admin(handler):
+    handler.current_session(("SUPER_ADMIN",))
+    username, email, password = handler.required("username", "email", "password")
+    handler.state.check_unique(username, email)
+    admin = handler.state.add_user(username, email, password, role="ADMIN", activated=True)
+    return 200, public_user(admin)
+
+
+@route("DELETE", r"/admin/delete/admin")
+def delete_admin(handler):
+    handler.current_session(("SUPER_ADMIN",))
+    admin = _user_or_404(handler, _query_id(handler), ("ADMIN",))
+    del handler.state.users[admin["id"]]
+    return 200, {"message": "Администратор удалён"}
+
+
+@route("DELETE", r"/admin/delete/user")
+def delete_user(handler):
+    handler.current_session(ADMIN_ROLES)
+    user = _user_or_404(handler, _query_id(handler), ("USER",))
+    del handler.state.users[user["id"]]
+    return 200, {"message": "Пользователь удалён"}
+
+
+@route("POST", r"/admin/create/warning")
+def create_warning(handler):
+    handler.current_session(ADMIN_ROLES)
+    user_id, reason = handler.required("userId", "reason")
+    if not user_id.isdigit():
+        raise HttpError(400, "Поле userId должно быть числом")
+    return 200, handler.state.add_warning(_user_or_404(handler, user_id, ("USER",)), reason)
+
+
+@route("GET", r"/user/info/profile")
+def profile(handler):
+    return 200, public_user(handler.current_user())
+
+
+@route("GET", r"/user/info/role")
+def role(handler):
+    return 200, {"role": handler.current_user()["role"]}
+
+
+@route("GET", r"/user/info/sessions")
+def sessions(handler):
+    current = handler.current_session()
+    return 200, [
+        {"id": session["id"], "createdAt": session["createdAt"], "current": session is current}
+        for session in handler.state.sessions.values()
+        if session["userId"] == current["userId"]
+    ]
+
+
+@route("DELETE", r"/user/info/sessions/revoke/all")
+def revoke_all(handler):
+    current = handler.current_session()
+    revoked = [
+        session_id for session_id, session in handler.state.sessions.items()
+        if session["userId"] == current["userId"] and session is not current
+    ]
+    for session_id in revoked:
+        handler.state.close_session(session_id)
+    return 200, {"message": f"Завершено сеансов: {len(revoked)}"}
+
+
+@route("GET", r"/user/info/avatar")
+def avatar(handler):
+    handler.current_session()
+    raise HttpError(404, "Аватар не загружен")
+
+
+class StubServer:
+    """Многопоточный HTTP-сервер заглушки в фоновом потоке"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StubState()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Заглушка бэкенда /api/v1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port)
+    print(f"Заглушка API: {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
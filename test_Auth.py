@@ -1,34 +1,38 @@
 import unittest
-import requests
 import json
-import random
 
-from test_utils import TestOutput
-
-BASE_URL = "http://localhost:8080/api/v1"
+from api_client import client
+from budgets import latency_budget
+from config import ADMIN_EMAIL, ADMIN_LOGIN, ADMIN_PASSWORD, BASE_URL
+from fixtures import auth_headers, isolated_admin_tokens
+from seed_data import seeder
+from schemas import assert_schema
+from test_utils import TestOutput, ordered, seeded_random
 
 
+@ordered
 class AuthAPITests(unittest.TestCase):
     """Позитивные тесты для эндпоинтов аутентификации"""
 
+    @latency_budget("/auth/login", 150, quantile=95)
     def test_01_login_success(self):
         """Успешный вход в систему"""
         url = f"{BASE_URL}/auth/login"
         headers = {"Content-Type": "application/json"}
-        data = {"login": "admin", "password": "Admin123!"}
+        data = {"login": ADMIN_LOGIN, "password": ADMIN_PASSWORD}
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(200, response.status_code)
+        # Каждый логин открывает сеанс вне общего кэша, закрываем его после теста
+        self.addCleanup(client.get, f"{BASE_URL}/auth/logout",
+                        headers=auth_headers(response.json()["accessToken"]))
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
     def test_02_refresh_token_success(self):
         """Успешное обновление токена"""
-        login_url = f"{BASE_URL}/auth/login"
-        headers = {"Content-Type": "application/json"}
-        login_data = {"login": "admin", "password": "Admin123!"}
-        
-        login_response = requests.post(login_url, headers=headers, data=json.dumps(login_data))
-        refresh_token = login_response.json()["refreshToken"]
+        # Обновление меняет пару токенов, поэтому общий кэш не используем
+        refresh_token = isolated_admin_tokens()["refreshToken"]
    
         url = f"{BASE_URL}/auth/refresh_token"
         headers = {
@@ -36,8 +40,12 @@ class AuthAPITests(unittest.TestCase):
             "Authorization": f"Bearer {refresh_token}"
         }
         
-        response = requests.post(url, headers=headers)
+        response = client.post(url, headers=headers)
         self.assertEqual(200, response.status_code)
+        # Сеанс открыт только для теста, закрываем его новым access token
+        self.addCleanup(client.get, f"{BASE_URL}/auth/logout",
+                        headers=auth_headers(response.json()["accessToken"]))
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
     def test_03_google_oauth_success(self):
@@ -45,18 +53,14 @@ class AuthAPITests(unittest.TestCase):
         url = f"{BASE_URL}/auth/login/oauth2/google"
         headers = {"Content-Type": "application/json"}
         
-        response = requests.get(url, headers=headers)
+        response = client.get(url, headers=headers)
         self.assertEqual(200, response.status_code)
         TestOutput.print_result(self._testMethodName, response)
 
     def test_04_logout_success(self):
         """Успешный выход из системы"""
-        login_url = f"{BASE_URL}/auth/login"
-        headers = {"Content-Type": "application/json"}
-        login_data = {"login": "admin", "password": "Admin123!"}
-        
-        login_response = requests.post(login_url, headers=headers, data=json.dumps(login_data))
-        access_token = login_response.json()["accessToken"]
+        # Выход завершает сеанс, поэтому общий кэш не используем
+        access_token = isolated_admin_tokens()["accessToken"]
 
         url = f"{BASE_URL}/auth/logout"
         headers = {
@@ -64,8 +68,9 @@ class AuthAPITests(unittest.TestCase):
             "Authorization": f"Bearer {access_token}"
         }
         
-        response = requests.get(url, headers=headers)
+        response = client.get(url, headers=headers)
         self.assertEqual(200, response.status_code)
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
     def test_05_registration_success(self):
@@ -73,15 +78,18 @@ class AuthAPITests(unittest.TestCase):
         url = f"{BASE_URL}/auth/registration"
         headers = {"Content-Type": "application/json"}
 
-        random_num = random.randint(10000, 99999)
+        random_num = seeded_random(self).randint(10000, 99999)
         data = {
             "username": f"testuser{random_num}",
             "email": f"testuser{random_num}@example.com",
             "password": "Test123!"
         }
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        # Учёт до запроса: пользователь удаляется, даже если ответ потерян
+        seeder().track_user(data["username"])
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(200, response.status_code)
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
 
@@ -94,7 +102,7 @@ class AuthNegativeTests(unittest.TestCase):
         headers = {"Content-Type": "application/json"}
         data = {"login": "nonexistent", "password": "WrongPass123!"}
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(404, response.status_code)
         TestOutput.print_result(self._testMethodName, response)
 
@@ -103,12 +111,12 @@ class AuthNegativeTests(unittest.TestCase):
         url = f"{BASE_URL}/auth/registration"
         headers = {"Content-Type": "application/json"}
         data = {
-            "username": "admin",
+            "username": ADMIN_LOGIN,
             "email": "newemail@example.com",
             "password": "Test123!"
         }
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(409, response.status_code)
         TestOutput.print_result(self._testMethodName, response)
 
@@ -118,11 +126,11 @@ class AuthNegativeTests(unittest.TestCase):
         headers = {"Content-Type": "application/json"}
         data = {
             "username": "newuser",
-            "email": "admin@example.com",
+            "email": ADMIN_EMAIL,
             "password": "Test123!"
         }
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(409, response.status_code)
         TestOutput.print_result(self._testMethodName, response)
 
@@ -1,52 +1,47 @@
 import unittest
-import requests
-import json
 
+from api_client import client
+from budgets import LatencyBudget, latency_budgets
+from config import BASE_URL
+from fixtures import ApiTestCase
+from seed_data import warned_user
+from schemas import USER, assert_schema
+from streaming import stream_list
 from test_utils import TestOutput
 
-BASE_URL = "http://localhost:8080/api/v1"
 
-
-class AdminUsersPositiveTests(unittest.TestCase):
+@latency_budgets({
+    "/admin/list/users": LatencyBudget(300),
+    "/admin/info/user/{id}": LatencyBudget(200),
+})
+class AdminUsersPositiveTests(ApiTestCase):
     """Позитивные тесты для эндпоинтов модерации пользователей"""
 
-    @classmethod
-    def setUpClass(cls):
-        """Получение токена перед всеми тестами"""
-        url = f"{BASE_URL}/auth/login"
-        headers = {"accept": "application/json", "Content-Type": "application/json"}
-        data = {"login": "admin", "password": "Admin123!"}
-        
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        cls.access_token = response.json()["accessToken"]
-        cls.user_headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {cls.access_token}"
-        }
-
     def test_get_all_users_info_success(self):
         """Успешное получение информации о всех пользователях"""
 
         url = f"{BASE_URL}/admin/list/users"
-        response = requests.get(url, headers=self.user_headers)
+        response, summary = stream_list(url, headers=self.user_headers, validate=USER)
         self.assertEqual(200, response.status_code)
-        TestOutput.print_result(self._testMethodName, response)
+        TestOutput.print_list_summary(self._testMethodName, response, summary)
 
     def test_get_user_info_by_id_success(self):
         """Успешное получение информации о пользователе по ID"""
 
         url = f"{BASE_URL}/admin/info/user/1"
-        response = requests.get(url, headers=self.user_headers)
+        response = client.get(url, headers=self.user_headers)
         self.assertEqual(200, response.status_code)
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)        
 
     def test_get_user_warnings_success(self):
         """Успешное получение предупреждений пользователя"""
         
-        url = f"{BASE_URL}/admin/info/user/26/warnings"  # написать надо 2 
-        response = requests.get(url, headers=self.user_headers)
+        user_id = warned_user()["id"]
+        url = f"{BASE_URL}/admin/info/user/{user_id}/warnings"
+        response = client.get(url, headers=self.user_headers)
         self.assertEqual(200, response.status_code)
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
 
@@ -55,51 +50,36 @@ class AdminUsersPositiveTests(unittest.TestCase):
 
         url = f"{BASE_URL}/admin/list/users"
         params = {"username": "TestUser"}
-        response = requests.get(url, headers=self.user_headers, params=params)
+        response, summary = stream_list(url, headers=self.user_headers, params=params, validate=USER)
         self.assertEqual(200, response.status_code)
-        TestOutput.print_result(self._testMethodName, response)
+        TestOutput.print_list_summary(self._testMethodName, response, summary)
 
     def test_get_all_users_with_email_filter_success(self):
         """Успешное получение пользователей с фильтром по email"""
 
         url = f"{BASE_URL}/admin/list/users"
         params = {"email": "TestUser@example.com"}
-        response = requests.get(url, headers=self.user_headers, params=params)
+        response, summary = stream_list(url, headers=self.user_headers, params=params, validate=USER)
         self.assertEqual(200, response.status_code)
-        TestOutput.print_result(self._testMethodName, response)
+        TestOutput.print_list_summary(self._testMethodName, response, summary)
 
     def test_get_all_active_users_success(self):
         """Успешное получение активных пользователей"""
 
         url = f"{BASE_URL}/admin/list/users"
         params = {"isBanned": False} 
-        response = requests.get(url, headers=self.user_headers, params=params)
+        response, summary = stream_list(url, headers=self.user_headers, params=params, validate=USER)
         self.assertEqual(200, response.status_code)
-        TestOutput.print_result(self._testMethodName, response)
+        TestOutput.print_list_summary(self._testMethodName, response, summary)
 
 
-class AdminUsersNegativeTests(unittest.TestCase):
+class AdminUsersNegativeTests(ApiTestCase):
     """Негативные тесты для эндпоинтов модерации пользователей"""
 
-    @classmethod
-    def setUpClass(cls):
-        """Получение токена перед всеми тестами"""
-        url = f"{BASE_URL}/auth/login"
-        headers = {"accept": "application/json", "Content-Type": "application/json"}
-        data = {"login": "admin", "password": "Admin123!"}
-        
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        cls.access_token = response.json()["accessToken"]
-        cls.user_headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {cls.access_token}"
-        }
-
     def test_get_user_info_by_id_not_found(self):
         """Получение информации о несуществующем пользователе"""
         url = f"{BASE_URL}/admin/info/user/99999"
-        response = requests.get(url, headers=self.user_headers)
+        response = client.get(url, headers=self.user_headers)
         if response.status_code == 404:
             self.assertEqual(404, response.status_code)
             TestOutput.print_result(self._testMethodName, response)
@@ -107,7 +87,7 @@ class AdminUsersNegativeTests(unittest.TestCase):
     def test_get_user_warnings_not_found(self):
         """Получение предупреждений несуществующего пользователя"""
         url = f"{BASE_URL}/admin/info/user/99999/warnings"
-        response = requests.get(url, headers=self.user_headers)
+        response = client.get(url, headers=self.user_headers)
         if response.status_code == 404:
             self.assertEqual(404, response.status_code)
             TestOutput.print_result(self._testMethodName, response)
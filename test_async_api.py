@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+
+from async_client import AsyncApiTestCase
+from config import BASE_URL
+from schemas import assert_schema
+from test_utils import TestOutput
+
+
+class AdminUsersAsyncTests(AsyncApiTestCase):
+    """Параллельные запросы к списку пользователей с фильтрами"""
+
+    async def test_get_all_users_filters_success(self):
+        """Успешное получение пользователей со всеми вариантами фильтров"""
+        url = f"{BASE_URL}/admin/list/users"
+        variants = {
+            "без фильтра": None,
+            "username": {"username": "TestUser"},
+            "email": {"email": "TestUser@example.com"},
+            "isBanned": {"isBanned": False},
+        }
+        responses = await asyncio.gather(*(
+            self.api.get(url, headers=self.user_headers, params=params)
+            for params in variants.values()
+        ))
+        for name, response in zip(variants, responses):
+            with self.subTest(filter=name):
+                self.assertEqual(200, response.status_code)
+                assert_schema(response)
+                TestOutput.print_result(f"{self._testMethodName} [{name}]", response)
+
+
+class UserInfoAsyncTests(AsyncApiTestCase):
+    """Параллельные запросы информации о пользователе"""
+
+    async def test_get_profile_role_sessions_success(self):
+        """Успешное получение профиля, роли и сеансов"""
+        paths = ["profile", "role", "sessions"]
+        responses = await asyncio.gather(*(
+            self.api.get(f"{BASE_URL}/user/info/{path}", headers=self.user_headers)
+            for path in paths
+        ))
+        for path, response in zip(paths, responses):
+            with self.subTest(endpoint=path):
+                self.assertEqual(200, response.status_code)
+                assert_schema(response)
+                TestOutput.print_result(f"{self._testMethodName} [{path}]", response)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,11 @@
 import unittest
-import requests
 import json
-import random
 
-from test_utils import TestOutput
-
-BASE_URL = "http://localhost:8080/api/v1"
+from api_client import client
+from config import ADMIN_EMAIL, BASE_URL
+from seed_data import seeder
+from schemas import assert_schema
+from test_utils import TestOutput, seeded_random
 
 
 class RecoveryPositiveTests(unittest.TestCase):
@@ -15,30 +15,34 @@ class RecoveryPositiveTests(unittest.TestCase):
         """Успешный запрос сброса пароля"""
         url = f"{BASE_URL}/recovery/reset-password"
         headers = {"accept": "application/json", "Content-Type": "application/json"}
-        data = {"email": "admin@example.com"}
+        data = {"email": ADMIN_EMAIL}
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(200, response.status_code)
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
     def test_resend_activation_success(self):
         """Успешная повторная отправка активации"""
         reg_url = f"{BASE_URL}/auth/registration"
         reg_headers = {"accept": "application/json", "Content-Type": "application/json"}
-        random_num = random.randint(100000, 999999)
+        random_num = seeded_random(self).randint(100000, 999999)
         reg_data = {
             "username": f"testuser{random_num}",
             "email": f"testuser{random_num}@example.com",
             "password": "Test123!"
         }
         
-        reg_response = requests.post(reg_url, headers=reg_headers, data=json.dumps(reg_data))
+        # Учёт до запроса: пользователь удаляется, даже если ответ потерян
+        seeder().track_user(reg_data["username"])
+        reg_response = client.post(reg_url, headers=reg_headers, data=json.dumps(reg_data))
         self.assertEqual(200, reg_response.status_code)
         url = f"{BASE_URL}/recovery/resend-activation"
         data = {"email": f"testuser{random_num}@example.com"}
         
-        response = requests.post(url, headers=reg_headers, data=json.dumps(data))
+        response = client.post(url, headers=reg_headers, data=json.dumps(data))
         self.assertEqual(200, response.status_code)
+        assert_schema(response)
         TestOutput.print_result(self._testMethodName, response)
 
 
@@ -49,9 +53,9 @@ class RecoveryNegativeTests(unittest.TestCase):
         """Повторная активация для уже активированного"""
         url = f"{BASE_URL}/recovery/resend-activation"
         headers = {"accept": "application/json", "Content-Type": "application/json"}
-        data = {"email": "admin@example.com"}
+        data = {"email": ADMIN_EMAIL}
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(400, response.status_code)
         TestOutput.print_result(self._testMethodName, response)
 
@@ -61,7 +65,7 @@ class RecoveryNegativeTests(unittest.TestCase):
         headers = {"accept": "application/json", "Content-Type": "application/json"}
         data = {"email": ""}
         
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = client.post(url, headers=headers, data=json.dumps(data))
         self.assertEqual(400, response.status_code)
         TestOutput.print_result(self._testMethodName, response)
 
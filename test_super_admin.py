@@ -1,72 +1,44 @@
 import unittest
-import requests
 import json
 
+from api_client import client
+from config import ADMIN_EMAIL, ADMIN_LOGIN, BASE_URL
+from fixtures import ApiTestCase
+from schemas import USER
+from streaming import stream_list
 from test_utils import TestOutput
 
-BASE_URL = "http://localhost:8080/api/v1"
 
-
-class SuperAdminPositiveTests(unittest.TestCase):
+class SuperAdminPositiveTests(ApiTestCase):
     """Позитивные тесты для эндпоинтов супер-администратора"""
 
-    @classmethod
-    def setUpClass(cls):
-        """Получение токена перед всеми тестами"""
-        url = f"{BASE_URL}/auth/login"
-        headers = {"accept": "application/json", "Content-Type": "application/json"}
-        data = {"login": "admin", "password": "Admin123!"}
-        
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        cls.access_token = response.json()["accessToken"]
-        cls.user_headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {cls.access_token}"
-        }
-
     def test_get_all_admins_info_success(self):
         """Успешное получение информации о всех администраторах """
         url = f"{BASE_URL}/admin/list/admins"
-        response = requests.get(url, headers=self.user_headers)
+        response, summary = stream_list(url, headers=self.user_headers, validate=USER)
         self.assertEqual(200, response.status_code)
-        TestOutput.print_result(self._testMethodName, response)
+        TestOutput.print_list_summary(self._testMethodName, response, summary)
 
     def test_get_all_admins_info_with_params_success(self):
         """Успешное получение информации об администраторах с параметрами"""
         url = f"{BASE_URL}/admin/list/admins"
-        params = {"username": "admin", "email": "admin@example.com"}
-        response = requests.get(url, headers=self.user_headers, params=params)
+        params = {"username": ADMIN_LOGIN, "email": ADMIN_EMAIL}
+        response, summary = stream_list(url, headers=self.user_headers, params=params, validate=USER)
         self.assertEqual(200, response.status_code)
-        TestOutput.print_result(self._testMethodName, response)
+        TestOutput.print_list_summary(self._testMethodName, response, summary)
 
-class SuperAdminNegativeTests(unittest.TestCase):
+class SuperAdminNegativeTests(ApiTestCase):
     """Негативные тесты для эндпоинтов супер-администратора"""
 
-    @classmethod
-    def setUpClass(cls):
-        """Получение токена перед всеми тестами"""
-        url = f"{BASE_URL}/auth/login"
-        headers = {"accept": "application/json", "Content-Type": "application/json"}
-        data = {"login": "admin", "password": "Admin123!"}
-        
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        cls.access_token = response.json()["accessToken"]
-        cls.user_headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {cls.access_token}"
-        }
-
     def test_create_new_admin_username_conflict(self):
         """Создание администратора с существующим username"""
         url = f"{BASE_URL}/admin/create/admin"
         data = {
-            "username": "admin",
+            "username": ADMIN_LOGIN,
             "email": "newemail@example.com",
             "password": "Test123!"
         }
-        response = requests.post(url, headers=self.user_headers, data=json.dumps(data))
+        response = client.post(url, headers=self.user_headers, data=json.dumps(data))
         if response.status_code == 409:
             self.assertEqual(409, response.status_code)
             TestOutput.print_result(self._testMethodName, response)
@@ -75,7 +47,7 @@ class SuperAdminNegativeTests(unittest.TestCase):
         """Получение информации о несуществующем администраторе"""
         url = f"{BASE_URL}/admin/info/admin"
         params = {"id": 99999}
-        response = requests.get(url, headers=self.user_headers, params=params)
+        response = client.get(url, headers=self.user_headers, params=params)
         if response.status_code == 404:
             self.assertEqual(404, response.status_code)
             TestOutput.print_result(self._testMethodName, response)
@@ -84,7 +56,7 @@ class SuperAdminNegativeTests(unittest.TestCase):
         """Удаление несуществующего администратора"""
         url = f"{BASE_URL}/admin/delete/admin"
         params = {"id": 99999}
-        response = requests.delete(url, headers=self.user_headers, params=params)
+        response = client.delete(url, headers=self.user_headers, params=params)
         if response.status_code == 404:
             self.assertEqual(404, response.status_code)
             TestOutput.print_result(self._testMethodName, response)
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+import uuid
+
+from api_client import ApiClient
+from auth import TokenProvider
+from config import ADMIN_LOGIN, ADMIN_PASSWORD, BASE_URL
+from fixtures import auth_headers
+from test_utils import TestOutput
+
+
+class TokenCacheTests(unittest.TestCase):
+    """Продление токенов и восстановление после токена, отвергнутого сервером"""
+
+    def setUp(self):
+        self.http = ApiClient()
+        self.addCleanup(self.http.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_file = os.path.join(directory.name, "tokens.json")
+        self.run_id = uuid.uuid4().hex
+        self.issued = []
+        self.addCleanup(self._logout_all)
+        self.provider = self._provider()
+
+    def _provider(self, run_id=None, renew_margin=30.0):
+        """Кэш над общим файлом теста, 401 клиента восстанавливается через него"""
+        provider = TokenProvider(cache_file=self.cache_file, renew_margin=renew_margin,
+                                 http=self.http, run_id=run_id or self.run_id)
+        self.http.token_recovery = provider.recover
+        return provider
+
+    def _token(self, provider):
+        access_token = provider.access_token(ADMIN_LOGIN, ADMIN_PASSWORD)
+        self.issued.append(access_token)
+        return access_token
+
+    def _logout_all(self):
+        """Закрытие сеансов теста; уже закрытые и заменённые отвечают 401"""
+        self.http.token_recovery = None
+        for access_token in set(self.issued):
+            self.http.get(f"{BASE_URL}/auth/logout", headers=auth_headers(access_token))
+
+    def _profile(self, access_token):
+        return self.http.get(f"{BASE_URL}/user/info/profile", headers=auth_headers(access_token))
+
+    def test_renew_before_expiry(self):
+        """Токен, срок которого подходит к концу, продлевается новым"""
+        first = self._token(self.provider)
+        self.provider.renew_margin = float("inf")
+        second = self._token(self.provider)
+        self.assertNotEqual(first, second)
+
+        response = self._profile(second)
+        self.assertEqual(200, response.status_code)
+        TestOutput.print_result(self._testMethodName, response)
+
+    def test_recover_stale_file_token(self):
+        """Токен из файла, отвергнутый сервером, заменяется повторным логином"""
+        stale = self._token(self.provider)
+        self.assertEqual(200, self.http.get(f"{BASE_URL}/auth/logout", headers=auth_headers(stale)).status_code)
+
+        # Новый процесс того же прогона читает закрытый сеанс из файла
+        provider = self._provider()
+        self.assertEqual(stale, self._token(provider))
+        response = self._profile(stale)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(stale, self._token(provider))
+        TestOutput.print_result(self._testMethodName, response)
+
+    def test_recover_replaced_token(self):
+        """Заголовки с токеном до продления получают действующий токен"""
+        first = self._token(self.provider)
+        self.provider.renew_margin = float("inf")
+        self._token(self.provider)
+        self.provider.renew_margin = 30.0
+
+        response = self._profile(first)
+        self.assertEqual(200, response.status_code)
+        TestOutput.print_result(self._testMethodName, response)
+
+    def test_other_run_entries_ignored(self):
+        """Записи файла, оставленные другим прогоном, не используются"""
+        previous = self._token(self.provider)
+        provider = self._provider(run_id=uuid.uuid4().hex)
+        self.assertNotEqual(previous, self._token(provider))
+
+    def test_foreign_token_not_recovered(self):
+        """Чужой токен не подменяется, 401 возвращается тесту"""
+        self._token(self.provider)
+        response = self._profile("invalid-token")
+        self.assertEqual(401, response.status_code)
+        TestOutput.print_result(self._testMethodName, response)
+
+
+if __name__ == "__main__":
+    unittest.main()
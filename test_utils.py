@@ -1,13 +1,125 @@
+import json
+import random
 import sys
+import threading
+from contextlib import contextmanager
+
+import config
+import results
+
+_local = threading.local()
+
 
 class TestOutput:
     """Класс для вывода результатов тестов"""
-    
+
+    # Нагрузочные прогоны отключают вывод, чтобы не тормозить на stdout
+    enabled = True
+    # Длинные тела ответов обрезаются до этого числа символов
+    max_body = 2000
+
     @staticmethod
     def print_result(test_name, response):
         """Вывод результата теста"""
+        if not TestOutput.enabled or getattr(_local, "muted", False):
+            return
+        result_writer = results.writer()
+        if result_writer is not None:
+            # Тело декодируется и обрезается в фоновом потоке
+            result_writer.submit({
+                "type": "response", "test": test_name,
+                "status": response.status_code, "body": response.content,
+            })
+            return
+        print(
+            f"\nТест: {test_name}"
+            f"\nСтатус код: {response.status_code}"
+            f"\n{TestOutput.truncate(response.text)}"
+        )
+
+    @staticmethod
+    def print_list_summary(test_name, response, summary):
+        """Вывод итога потокового чтения списка вместо всего тела"""
+        if not TestOutput.enabled or getattr(_local, "muted", False):
+            return
+        if summary is None:
+            TestOutput.print_result(test_name, response)
+            return
+        result_writer = results.writer()
+        if result_writer is not None:
+            result_writer.submit({
+                "type": "list", "test": test_name, "status": response.status_code,
+                "count": summary.count, "pages": summary.pages,
+                "bytesRead": summary.bytes_read, "sample": summary.sample,
+            })
+            return
+        sample = json.dumps(summary.sample, ensure_ascii=False)
         print(
             f"\nТест: {test_name}"
             f"\nСтатус код: {response.status_code}"
-            f"\n{response.text}"
-        )
\ No newline at end of file
+            f"\nЗаписей: {summary.count}, страниц: {summary.pages}"
+            f", получено байт: {summary.bytes_read}"
+            f"\nПервые записи: {TestOutput.truncate(sample)}"
+        )
+
+    @staticmethod
+    def truncate(text):
+        """Обрезка длинного текста до max_body символов"""
+        if len(text) <= TestOutput.max_body:
+            return text
+        hidden = len(text) - TestOutput.max_body
+        return f"{text[:TestOutput.max_body]}... (ещё {hidden} символов)"
+
+    @staticmethod
+    @contextmanager
+    def muted():
+        """Отключение вывода результатов в текущем потоке"""
+        previous = getattr(_local, "muted", False)
+        _local.muted = True
+        try:
+            yield
+        finally:
+            _local.muted = previous
+
+    @staticmethod
+    def print_connection_stats(stats):
+        """Вывод статистики переиспользования соединений"""
+        share = stats["reused"] / stats["requests"] if stats["requests"] else 0
+        print(
+            f"\nЗапросов: {stats['requests']}"
+            f"\nОткрыто соединений: {stats['connections']}"
+            f"\nПереиспользовано: {stats['reused']} ({share:.0%})"
+        )
+
+    @staticmethod
+    def print_fault_stats(stats):
+        """Вывод статистики внедрённых сетевых сбоев"""
+        print(
+            f"\nПопыток: {stats['attempts']}, повторов: {stats['retries']}"
+            f"\nОборвано соединений: {stats['dropped']}, ответов 503: {stats['injected_5xx']}"
+            f", таймаутов: {stats['timeouts']}"
+        )
+
+
+def exclusive(test):
+    """Тест с побочными эффектами для других тестов: параллельный запуск
+    выполняет его отдельно, после всех остальных"""
+    test.exclusive = True
+    return test
+
+
+def ordered(cls):
+    """Тесты класса зависят от порядка и выполняются одним потоком"""
+    cls.ordered = True
+    return cls
+
+
+def seeded_random(test):
+    """Генератор случайных данных теста
+
+    При заданном config.SEED значения зависят только от seed и имени теста,
+    поэтому запросы совпадают при записи и воспроизведении кассеты.
+    """
+    if config.SEED is None:
+        return random.Random()
+    return random.Random(f"{config.SEED}:{test.id()}")